@@ -0,0 +1,272 @@
+# Local stand-in for the Supabase REST API (PostgREST) used by the benchmarks.
+#
+#   python benchmarks/fake_postgrest.py --port 54321 --latency-ms 20
+#
+# Implements the subset of PostgREST the Flask app uses: select with column
+# lists, eq/neq/gt/gte/lt/lte/in/is filters, or=/and= groups, order, limit,
+# offset, insert (single and bulk) and update. Embedded selects answer
+# PGRST200 like a schema without the foreign keys, so the app takes its
+# separate-lookup path. Inserting a chassis or body selection copies it onto
+# the session row, which the Node backend does in production.
+import argparse
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+FIXTURES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'catalog.json')
+
+TABLES = ('chassis', 'body_configurations', 'configuration_sessions', 'configuration_selections', 'quotes')
+
+
+def load_fixtures(path=FIXTURES_PATH):
+    with open(path) as f:
+        fixtures = json.load(f)
+    return {table: list(fixtures.get(table, [])) for table in TABLES}
+
+
+def split_top_level(text):
+    # Splits a,b,and(c,d) on commas outside parentheses and double quotes
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        if char == ',' and depth == 0 and not quoted:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    parts.append(current)
+    return parts
+
+
+def coerce(value, like):
+    # Query values arrive as text, compare them as the column's type
+    value = value.strip('"')
+    if isinstance(like, bool):
+        return value == 'true'
+    if isinstance(like, (int, float)):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def matches(row, column, operator, value):
+    current = row.get(column)
+    if operator == 'is':
+        return current is None if value == 'null' else str(current).lower() == value
+    if operator == 'in':
+        return str(current) in [item.strip('"') for item in split_top_level(value.strip('()'))]
+    if current is None:
+        return False
+    value = coerce(value, current)
+    if isinstance(value, str):
+        current = str(current)
+    if operator == 'eq':
+        return current == value
+    if operator == 'neq':
+        return current != value
+    if operator == 'gt':
+        return current > value
+    if operator == 'gte':
+        return current >= value
+    if operator == 'lt':
+        return current < value
+    if operator == 'lte':
+        return current <= value
+    raise ValueError(f'Unsupported operator: {operator}')
+
+
+def matches_group(row, group, combine):
+    results = []
+    for condition in split_top_level(group):
+        if condition.startswith(('and(', 'or(')):
+            name, _, inner = condition.partition('(')
+            results.append(matches_group(row, inner[:-1], all if name == 'and' else any))
+        else:
+            column, operator, value = condition.split('.', 2)
+            results.append(matches(row, column, operator, value))
+    return combine(results)
+
+
+def row_filter(params):
+    conditions = []
+    for key, value in params:
+        if key in ('select', 'order', 'limit', 'offset', 'columns', 'on_conflict'):
+            continue
+        if key in ('or', 'and'):
+            conditions.append(lambda row, group=value[1:-1], combine=any if key == 'or' else all:
+                              matches_group(row, group, combine))
+        else:
+            operator, _, operand = value.partition('.')
+            conditions.append(lambda row, column=key, operator=operator, operand=operand:
+                              matches(row, column, operator, operand))
+    return lambda row: all(condition(row) for condition in conditions)
+
+
+def sort_rows(rows, order):
+    # Applied last key first so earlier keys win, nulls last unless asked otherwise
+    for part in reversed(order.split(',')):
+        column, *modifiers = part.split('.')
+        descending = 'desc' in modifiers
+        nulls_first = 'nullsfirst' in modifiers
+        present = [row for row in rows if row.get(column) is not None]
+        missing = [row for row in rows if row.get(column) is None]
+        present.sort(key=lambda row: row[column], reverse=descending)
+        rows = missing + present if nulls_first else present + missing
+    return rows
+
+
+class FakePostgrest:
+    def __init__(self, tables=None, latency=0.0):
+        self.tables = tables if tables is not None else load_fixtures()
+        self.latency = latency
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def select(self, table, params):
+        params = list(params)
+        columns = dict(params).get('select', '*')
+        if '(' in columns:
+            return 400, {'code': 'PGRST200', 'details': None, 'hint': None,
+                         'message': 'Could not find a relationship in the schema cache'}
+
+        keep = row_filter(params)
+        with self.lock:
+            rows = [dict(row) for row in self.tables[table] if keep(row)]
+
+        options = dict(params)
+        if 'order' in options:
+            rows = sort_rows(rows, options['order'])
+        offset = int(options.get('offset', 0))
+        limit = int(options['limit']) if 'limit' in options else None
+        rows = rows[offset:offset + limit if limit is not None else None]
+
+        if columns != '*':
+            names = [name.strip() for name in columns.split(',')]
+            rows = [{name: row.get(name) for name in names} for row in rows]
+        return 200, rows
+
+    def insert(self, table, payload):
+        items = payload if isinstance(payload, list) else [payload]
+        created = []
+        now = datetime.now(timezone.utc).isoformat()
+        with self.lock:
+            for item in items:
+                row = dict(item)
+                row.setdefault('id', str(uuid.uuid4()))
+                row.setdefault('created_at', now)
+                row.setdefault('updated_at', now)
+                if table == 'quotes':
+                    row.setdefault('quote_number', f"ENQ-{datetime.now():%Y%m%d}-{len(self.tables[table]) + 1001}")
+                self.tables[table].append(row)
+                created.append(dict(row))
+                if table == 'configuration_selections':
+                    self.copy_selection_to_session(row)
+        return 201, created
+
+    def copy_selection_to_session(self, selection):
+        column = {'chassis': 'selected_chassis_id', 'body': 'selected_body_id'}.get(selection.get('selection_type'))
+        if column is None:
+            return
+        for session in self.tables['configuration_sessions']:
+            if str(session['id']) == str(selection['session_id']):
+                session[column] = selection['selected_item_id']
+
+    def update(self, table, params, payload):
+        keep = row_filter(params)
+        updated = []
+        with self.lock:
+            for row in self.tables[table]:
+                if keep(row):
+                    row.update(payload)
+                    updated.append(dict(row))
+        return 200, updated
+
+    def handle(self, method, path, query, body):
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            self.requests += 1
+
+        found = re.match(r'^/rest/v1/(\w+)$', path)
+        if not found or found.group(1) not in self.tables:
+            return 404, {'code': 'PGRST205', 'details': None, 'hint': None, 'message': f'Unknown path {path}'}
+        table = found.group(1)
+        params = parse_qsl(query, keep_blank_values=True)
+
+        if method in ('GET', 'HEAD'):
+            return self.select(table, params)
+        if method == 'POST':
+            return self.insert(table, json.loads(body or b'null'))
+        if method == 'PATCH':
+            return self.update(table, params, json.loads(body or b'{}'))
+        return 405, {'message': f'Unsupported method {method}'}
+
+
+def make_handler(fake):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out in separate writes, don't let them wait on delayed ACKs
+        disable_nagle_algorithm = True
+
+        def respond(self):
+            url = urlsplit(self.path)
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length) if length else b''
+            try:
+                status, payload = fake.handle(self.command, url.path, url.query, body)
+            except (ValueError, KeyError) as e:
+                status, payload = 400, {'code': 'PGRST100', 'details': None, 'hint': None, 'message': str(e)}
+
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            if self.command != 'HEAD':
+                self.wfile.write(data)
+
+        do_GET = do_HEAD = do_POST = do_PATCH = do_DELETE = respond
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(fake, host='127.0.0.1', port=0):
+    # Returns the running server, its URL is f'http://{host}:{server.server_port}'
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local PostgREST stand-in with the benchmark catalog')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=54321)
+    parser.add_argument('--latency-ms', type=float, default=0, help='delay added to every request')
+    parser.add_argument('--fixtures', default=FIXTURES_PATH)
+    args = parser.parse_args()
+
+    fake = FakePostgrest(load_fixtures(args.fixtures), args.latency_ms / 1000)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"Serving fake PostgREST on http://{args.host}:{args.port}/rest/v1/")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
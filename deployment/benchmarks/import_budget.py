@@ -0,0 +1,65 @@
+# Import-time budget for the Flask app, run from /deployment:
+#
+#   python benchmarks/import_budget.py --budget-ms 400
+#
+# Imports src.main_full in fresh interpreters with -X importtime and fails
+# (exit status 1) when the fastest run is over budget, or when a dependency
+# that is meant to load on first use was imported at startup.
+import argparse
+import os
+import subprocess
+import sys
+
+DEPLOYMENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Loaded by the first request that needs them, never by importing the app
+DEFERRED_MODULES = ('supabase', 'postgrest', 'reportlab', 'numpy')
+
+
+def import_app(module):
+    # Returns ({module: cumulative microseconds}, [deferred modules that were loaded])
+    check = f"import sys, {module}; print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', check], cwd=DEPLOYMENT_DIR,
+                            capture_output=True, text=True, check=True)
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, total, name = line[len('import time:'):].split('|')
+        # One space before a top-level import, two more per level of nesting
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        cumulative[name.strip()] = (int(total), depth)
+    loaded = [name for name in result.stdout.strip().split(',') if name]
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fail when importing the app gets slow')
+    parser.add_argument('--module', default='src.main_full')
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('IMPORT_BUDGET_MS', '400')))
+    parser.add_argument('--runs', type=int, default=3, help='the fastest run is compared, the first pays for cold disk caches')
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_app(args.module) for _ in range(args.runs)]
+    cumulative, loaded = min(runs, key=lambda run: run[0][args.module][0])
+    total_ms = cumulative[args.module][0] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms, fastest of {args.runs})")
+    # Everything the app module imports directly, by cumulative time
+    top_level = sorted(((total, name) for name, (total, depth) in cumulative.items() if depth == 1), reverse=True)
+    for total, name in top_level[:args.top]:
+        print(f"  {total / 1000:>8.1f} ms  {name}")
+
+    failed = False
+    if loaded:
+        print(f"imported at startup but meant to load on first use: {', '.join(loaded)}")
+        failed = True
+    if total_ms > args.budget_ms:
+        print(f"over budget by {total_ms - args.budget_ms:.0f} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+# Micro-benchmark for quote PDF rendering.
+#
+#   python benchmarks/pdf_render.py --iterations 200
+#
+# "per-request template" rebuilds the stylesheet, table styles and static
+# paragraphs for every PDF, which is what the download route used to do.
+# "shared template" reuses the objects built once at import time.
+import argparse
+import os
+import statistics
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.services.quote_pdf import render_quote_pdf
+from src.services.quote_template import QuoteTemplate, quote_template
+
+SAMPLE_QUOTE = {
+    'quote_number': 'ENQ-20250101-1001',
+    'valid_until': '2025-01-31T00:00:00',
+    'customer_name': 'Demo Customer',
+    'customer_email': 'demo@example.com',
+    'customer_company': 'Demo Transit',
+    'base_price': 41585.0,
+    'destination_charge': 2095.0,
+    'total_price': 43680.0
+}
+SAMPLE_CHASSIS = {
+    'series': 'E3F',
+    'wheelbase_inches': 138,
+    'model_year': 2024,
+    'gvwr_lbs': 10000,
+    'engine_type': 'V8 Gas',
+    'fuel_type': 'Gasoline'
+}
+SAMPLE_BODY = {
+    'configuration_name': 'B4 XR - 24ft Electric Extended Range',
+    'length_ft': 24,
+    'passenger_capacity': 18,
+    'wheelchair_positions': 2,
+    'fuel_type': 'Electric',
+    'electric_range_miles': 150
+}
+
+
+def measure(iterations, make_template):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        render_quote_pdf(SAMPLE_QUOTE, SAMPLE_CHASSIS, SAMPLE_BODY, make_template())
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"{label:<24} mean {statistics.mean(timings):7.2f} ms   p50 {statistics.median(timings):7.2f} ms   p95 {p95:7.2f} ms")
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quote PDF render micro-benchmark')
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    args = parser.parse_args()
+
+    measure(args.warmup, lambda: quote_template)
+
+    before = report('per-request template', measure(args.iterations, QuoteTemplate))
+    after = report('shared template', measure(args.iterations, lambda: quote_template))
+    print(f"speedup {before / after:.2f}x ({before - after:.2f} ms saved per PDF)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+# Load test for the configurator wizard against a local PostgREST stand-in.
+#
+#   python benchmarks/wizard_load.py --concurrency 16 --flows 400
+#   python benchmarks/wizard_load.py --baseline benchmarks/results/baseline.json
+#
+# Every simulated customer runs the whole wizard: create a session, browse the
+# catalog, pick a chassis and a compatible body, price it, create a quote and
+# download its PDF. The app from main_full.py (or main_async.py with
+# --app async) is served on a local port and talks to fake_postgrest.py over
+# HTTP, so the Supabase client, pooling and retries are all exercised.
+#
+# Results are written to benchmarks/results/<timestamp>.json. With --baseline
+# the run is compared per endpoint, and the exit status is 1 when any p95
+# regressed by more than --max-regression percent.
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+import httpx
+from fake_postgrest import FakePostgrest, load_fixtures, start_server, FIXTURES_PATH
+
+# Any well-formed key passes the client's format check, the fake ignores it
+FAKE_ANON_KEY = 'benchmark.fake.key'
+
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile of an already sorted list
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self.timings = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def call(self, client, label, method, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = client.request(method, url, **kwargs)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            self.timings.setdefault(label, []).append(elapsed)
+            if not ok:
+                self.errors[label] = self.errors.get(label, 0) + 1
+        if not ok:
+            raise FlowError(label, response)
+        return response
+
+    def summary(self):
+        endpoints = {}
+        for label, timings in self.timings.items():
+            timings = sorted(timings)
+            endpoints[label] = {
+                'count': len(timings),
+                'errors': self.errors.get(label, 0),
+                'mean_ms': round(sum(timings) / len(timings), 3),
+                'p50_ms': round(percentile(timings, 0.50), 3),
+                'p95_ms': round(percentile(timings, 0.95), 3),
+                'p99_ms': round(percentile(timings, 0.99), 3),
+                'max_ms': round(timings[-1], 3)
+            }
+        return endpoints
+
+
+class FlowError(Exception):
+    def __init__(self, label, response):
+        status = response.status_code if response is not None else 'connection error'
+        super().__init__(f'{label}: {status}')
+
+
+def run_flow(client, recorder, rng):
+    session = recorder.call(client, 'POST /api/configurations/sessions', 'POST', '/api/configurations/sessions',
+                            json={'userType': 'customer'}).json()
+    session_id = session['sessionId']
+
+    chassis = recorder.call(client, 'GET /api/chassis', 'GET', '/api/chassis').json()
+    recorder.call(client, 'GET /api/catalog/vehicles', 'GET', '/api/catalog/vehicles',
+                  params={'fuelType': rng.choice(['all', 'Electric', 'Gasoline']), 'sort': '-passengers'})
+
+    selected_chassis = rng.choice(chassis)
+    recorder.call(client, 'POST /api/configurations/sessions/<id>/selections', 'POST',
+                  f'/api/configurations/sessions/{session_id}/selections',
+                  json={'selectionType': 'chassis', 'selectedItemId': selected_chassis['id'],
+                        'selectedItemCode': selected_chassis['code']})
+
+    bodies = recorder.call(client, 'GET /api/chassis/<id>/compatible-bodies', 'GET',
+                           f"/api/chassis/{selected_chassis['id']}/compatible-bodies").json()
+    if bodies:
+        selected_body = rng.choice(bodies)
+        recorder.call(client, 'POST /api/configurations/sessions/<id>/selections', 'POST',
+                      f'/api/configurations/sessions/{session_id}/selections',
+                      json={'selectionType': 'body', 'selectedItemId': selected_body['id'],
+                            'selectedItemCode': selected_body['code']})
+
+    recorder.call(client, 'GET /api/configurations/sessions/<id>', 'GET', f'/api/configurations/sessions/{session_id}')
+    recorder.call(client, 'GET /api/pricing/sessions/<id>', 'GET', f'/api/pricing/sessions/{session_id}')
+
+    quote = recorder.call(client, 'POST /api/quotes', 'POST', '/api/quotes', json={
+        'sessionId': session_id,
+        'customerName': 'Benchmark Customer',
+        'customerEmail': 'benchmark@example.com',
+        'customerCompany': 'Benchmark Transit'
+    }).json()
+    recorder.call(client, 'GET /api/quotes/<id>/pdf', 'GET', quote['pdfUrl'])
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def serve_app(kind):
+    # Returns (port, stop). The Flask app is imported only now so it picks up
+    # the fake's SUPABASE_URL.
+    if kind == 'async':
+        # uvicorn runs in its own process as in production, so the load
+        # generator's threads don't compete with the event loop for the GIL
+        port = free_port()
+        process = subprocess.Popen([sys.executable, '-m', 'uvicorn', 'src.main_async:app', '--host', '127.0.0.1',
+                                    '--port', str(port), '--log-level', 'warning'],
+                                   cwd=os.path.dirname(BENCHMARKS_DIR), env=os.environ.copy())
+        deadline = time.monotonic() + 60
+        while True:
+            if process.poll() is not None:
+                sys.exit(f'uvicorn exited with status {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    process.terminate()
+                    sys.exit('uvicorn did not start within 60 s')
+                time.sleep(0.1)
+
+        def stop():
+            process.terminate()
+            process.wait(timeout=30)
+        return port, stop
+
+    from werkzeug.serving import make_server
+    from src.main_full import app
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_port, server.shutdown
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BENCHMARKS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    fake = FakePostgrest(load_fixtures(args.fixtures), args.upstream_latency_ms / 1000)
+    upstream = start_server(fake)
+    os.environ['SUPABASE_URL'] = f'http://127.0.0.1:{upstream.server_port}'
+    os.environ['SUPABASE_ANON_KEY'] = FAKE_ANON_KEY
+    # Every run loads the fixtures, not a catalog file left by an earlier run
+    os.environ['CATALOG_SNAPSHOT_PATH'] = ''
+    port, stop_app = serve_app(args.app)
+    base_url = f'http://127.0.0.1:{port}'
+
+    recorder = Recorder()
+    remaining = [args.flows]
+    failures = []
+    counter_lock = threading.Lock()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            while True:
+                with counter_lock:
+                    if remaining[0] <= 0:
+                        return
+                    remaining[0] -= 1
+                try:
+                    run_flow(client, recorder, rng)
+                except FlowError as e:
+                    failures.append(str(e))
+
+    try:
+        # Warm-up flows load the catalog and fill caches before timing starts
+        warmup = Recorder()
+        with httpx.Client(base_url=base_url, timeout=60) as client:
+            for i in range(args.warmup):
+                run_flow(client, warmup, random.Random(-1 - i))
+
+        upstream_before = fake.requests
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker, args=(args.seed + i,)) for i in range(args.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.perf_counter() - start
+    finally:
+        stop_app()
+        upstream.shutdown()
+
+    endpoints = recorder.summary()
+    requests = sum(endpoint['count'] for endpoint in endpoints.values())
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'config': {
+            'app': args.app,
+            'concurrency': args.concurrency,
+            'flows': args.flows,
+            'warmup': args.warmup,
+            'upstream_latency_ms': args.upstream_latency_ms,
+            'seed': args.seed
+        },
+        'duration_s': round(duration, 3),
+        'throughput': {
+            'flows_per_s': round((args.flows - len(failures)) / duration, 2),
+            'requests_per_s': round(requests / duration, 2)
+        },
+        'upstream_requests': fake.requests - upstream_before,
+        'failed_flows': len(failures),
+        'failures': failures[:20],
+        'endpoints': endpoints
+    }
+
+
+def report(result):
+    print(f"{result['config']['flows']} flows, concurrency {result['config']['concurrency']}, "
+          f"upstream latency {result['config']['upstream_latency_ms']} ms, app {result['config']['app']}")
+    print(f"{result['duration_s']:.2f} s  {result['throughput']['flows_per_s']} flows/s  "
+          f"{result['throughput']['requests_per_s']} req/s  {result['upstream_requests']} upstream requests  "
+          f"{result['failed_flows']} failed flows")
+    print(f"{'endpoint':<52} {'count':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, stats in result['endpoints'].items():
+        print(f"{label:<52} {stats['count']:>6} {stats['errors']:>4} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+
+def compare(result, baseline, max_regression):
+    # Returns the endpoints whose p95 grew by more than max_regression percent
+    print(f"\ncompared with {baseline.get('commit') or 'baseline'} from {baseline.get('timestamp')}")
+    print(f"{'endpoint':<52} {'p95 before':>11} {'p95 now':>9} {'change':>8}")
+    regressions = []
+    for label, stats in result['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(label)
+        if not before:
+            continue
+        change = (stats['p95_ms'] - before['p95_ms']) / before['p95_ms'] * 100 if before['p95_ms'] else 0.0
+        flag = '  REGRESSION' if change > max_regression else ''
+        print(f"{label:<52} {before['p95_ms']:>11.2f} {stats['p95_ms']:>9.2f} {change:>7.1f}%{flag}")
+        if flag:
+            regressions.append(label)
+
+    before_rate = baseline.get('throughput', {}).get('flows_per_s')
+    if before_rate:
+        now_rate = result['throughput']['flows_per_s']
+        print(f"throughput {before_rate} -> {now_rate} flows/s ({(now_rate - before_rate) / before_rate * 100:+.1f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Configurator wizard load test')
+    parser.add_argument('--app', choices=['full', 'async'], default='full', help='main_full.py or main_async.py')
+    parser.add_argument('--concurrency', type=int, default=8, help='simulated customers in parallel')
+    parser.add_argument('--flows', type=int, default=200, help='wizard runs in total')
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--upstream-latency-ms', type=float, default=20, help='delay per Supabase request')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--fixtures', default=FIXTURES_PATH)
+    parser.add_argument('--output', help='result file, default benchmarks/results/<timestamp>.json')
+    parser.add_argument('--baseline', help='earlier result file to compare with')
+    parser.add_argument('--max-regression', type=float, default=10, help='allowed p95 growth in percent')
+    args = parser.parse_args()
+
+    result = run(args)
+    report(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+        f.write('\n')
+    print(f"\nresults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(result, json.load(f), args.max_regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,8 +3,9 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory, jsonify
+from flask import Flask, jsonify
 from flask_cors import CORS
+from src.services.static_files import StaticManifest, send_static
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
@@ -12,6 +13,9 @@ app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
 # Enable CORS for all routes
 CORS(app)
 
+# Static files are indexed once, serve() never touches the filesystem
+static_manifest = StaticManifest(app.static_folder)
+
 # Demo data for the configurator
 DEMO_CHASSIS = [
     {
@@ -141,18 +145,16 @@ def download_pdf(quote_id):
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # Known files come from the startup manifest, everything else is a SPA route
+    entry = static_manifest.get(path) if path != "" else None
+    if entry is None:
+        entry = static_manifest.index
+    if entry is None:
+        return "index.html not found", 404
+    return send_static(entry)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,52 @@
+import os
+import sys
+# DON'T CHANGE THIS !!!
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+# ASGI entry point: uvicorn src.main_async:app
+# The views in routes/async_api.py run on the event loop with an async Supabase
+# client, every other request goes to the Flask app from main_full.py.
+import asyncio
+from a2wsgi import WSGIMiddleware
+from src.main_full import app as flask_app
+from src.routes.async_api import async_url_map
+from src.services.asgi_app import AsyncApp
+from src.services.async_supabase import close_async_supabase
+from src.services.catalog_cache import catalog_cache
+from src.services.json_cache import json_encoder
+from src.services.pdf_jobs import pdf_render_queue
+from src.services.selection_buffer import selection_buffer
+
+async def startup():
+    # Load the catalog before the first request instead of inside one
+    try:
+        await asyncio.to_thread(catalog_cache.get)
+    except Exception as e:
+        print(f"Catalog preload error: {e}")
+
+async def shutdown():
+    # uvicorn re-raises SIGTERM once the server stopped, the process dies
+    # before atexit handlers run. Buffered selections are written and the PDF
+    # render workers stopped here, they would outlive the process otherwise.
+    try:
+        await asyncio.to_thread(selection_buffer.flush_all)
+    except Exception as e:
+        print(f"Selection flush error: {e}")
+    await asyncio.to_thread(pdf_render_queue.shutdown)
+    await close_async_supabase()
+
+app = AsyncApp(
+    async_url_map,
+    # a2wsgi runs Flask on a thread pool, asgiref's WsgiToAsgi breaks
+    # intermittently under uvicorn on keep-alive connections
+    WSGIMiddleware(flask_app),
+    encode_json=json_encoder(flask_app.json),
+    # Same CORS policy as CORS(app) on the Flask side
+    response_headers={'Access-Control-Allow-Origin': '*'},
+    on_startup=startup,
+    on_shutdown=shutdown
+)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run(app, host='0.0.0.0', port=5000)
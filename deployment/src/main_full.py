@@ -3,7 +3,7 @@ import sys
 # DON'T CHANGE THIS !!!
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from flask import Flask, send_from_directory
+from flask import Flask
 from flask_cors import CORS
 from src.routes.chassis import chassis_bp
 from src.routes.bodies import bodies_bp
@@ -11,13 +11,32 @@ from src.routes.configurations import configurations_bp
 from src.routes.pricing import pricing_bp
 from src.routes.quotes import quotes_bp
 from src.routes.catalog import catalog_bp
+from src.routes.admin import admin_bp
+from src.services.json_provider import create_json_provider
+from src.services.compression import init_compression
+from src.services.metrics import init_metrics
+from src.services.profiling import init_profiling
+from src.services.static_files import StaticManifest, send_static
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(__file__), 'static'))
 app.config['SECRET_KEY'] = 'asdf#FGSgvasgf$5$WGT'
+app.json = create_json_provider(app)
+
+# Request, Supabase and PDF timings, served at /metrics
+init_metrics(app)
+
+# Opt-in stack sampling of slow or flagged requests, see PROFILE_* settings
+init_profiling(app)
+
+# gzip/brotli for JSON and text responses above the size threshold
+init_compression(app)
 
 # Enable CORS for all routes
 CORS(app)
 
+# Static files are indexed once, serve() never touches the filesystem
+static_manifest = StaticManifest(app.static_folder)
+
 # Register API blueprints
 app.register_blueprint(chassis_bp, url_prefix='/api')
 app.register_blueprint(bodies_bp, url_prefix='/api')
@@ -25,22 +44,21 @@ app.register_blueprint(configurations_bp, url_prefix='/api')
 app.register_blueprint(pricing_bp, url_prefix='/api')
 app.register_blueprint(quotes_bp, url_prefix='/api')
 app.register_blueprint(catalog_bp, url_prefix='/api')
+app.register_blueprint(admin_bp, url_prefix='/api')
 
 @app.route('/', defaults={'path': ''})
 @app.route('/<path:path>')
 def serve(path):
-    static_folder_path = app.static_folder
-    if static_folder_path is None:
+    if app.static_folder is None:
             return "Static folder not configured", 404
 
-    if path != "" and os.path.exists(os.path.join(static_folder_path, path)):
-        return send_from_directory(static_folder_path, path)
-    else:
-        index_path = os.path.join(static_folder_path, 'index.html')
-        if os.path.exists(index_path):
-            return send_from_directory(static_folder_path, 'index.html')
-        else:
-            return "index.html not found", 404
+    # Known files come from the startup manifest, everything else is a SPA route
+    entry = static_manifest.get(path) if path != "" else None
+    if entry is None:
+        entry = static_manifest.index
+    if entry is None:
+        return "index.html not found", 404
+    return send_static(entry)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=5000, debug=True)
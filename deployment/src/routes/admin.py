@@ -0,0 +1,47 @@
+from flask import Blueprint, jsonify, request
+import hmac
+import os
+from src.services.catalog_cache import catalog_cache
+from src.services.warmup import warm_up
+
+admin_bp = Blueprint('admin', __name__)
+
+# Admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
+
+def is_authorized():
+    token = request.headers.get('X-Admin-Token', '')
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(token, ADMIN_TOKEN)
+
+@admin_bp.route('/admin/catalog/invalidate', methods=['POST'])
+def invalidate_catalog():
+    if not is_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    try:
+        # Drop the snapshot and reload it right away so no visitor pays for the cold load
+        catalog_cache.invalidate()
+        snapshot = catalog_cache.get()
+        
+        return jsonify({
+            'invalidated': True,
+            'version': snapshot.version,
+            'source': snapshot.source,
+            'chassisCount': len(snapshot.chassis),
+            'bodyCount': len(snapshot.bodies)
+        })
+        
+    except Exception as e:
+        print(f"Catalog invalidation error: {e}")
+        return jsonify({'error': 'Failed to reload catalog'}), 500
+
+@admin_bp.route('/warmup', methods=['GET', 'POST'])
+def warmup():
+    # No token needed: it only does what the first requests would do anyway,
+    # so a platform cron or health check can call it after a cold start
+    try:
+        return jsonify({'warm': True, 'timingsMs': warm_up()})
+        
+    except Exception as e:
+        print(f"Warm-up error: {e}")
+        return jsonify({'error': 'Warm-up failed'}), 500
@@ -0,0 +1,111 @@
+import asyncio
+from werkzeug.routing import Map, Rule
+from src.services.asgi_app import AsyncResponse
+from src.services.async_bundle import load_session_bundle_async, load_quote_bundle_async, get_session_async
+from src.services.async_supabase import get_async_supabase
+from src.services.pdf_cache import pdf_cache, quote_pdf_cache_key
+from src.services.pdf_jobs import pdf_render_queue
+from src.services.pricing_engine import pricing_engine
+from src.services.selection_buffer import SELECTION_WRITE_BEHIND, flush_session_selections
+from src.routes.configurations import session_to_dict
+from src.routes.quotes import missing_quote_field, quote_warnings, new_quote_row, quote_created, quote_pdf_response
+
+# Async versions of the views that wait on several Supabase round trips,
+# served by main_async.py. Their JSON matches the Flask views they shadow.
+
+async def create_quote(app, request):
+    try:
+        data = await request.get_json() or {}
+        
+        field = missing_quote_field(data)
+        if field:
+            return app.json({'error': f'Missing required field: {field}'}, 400)
+        
+        bundle = await load_session_bundle_async(data['sessionId'])
+        
+        if bundle is None:
+            return app.json({'error': 'Session not found'}, 404)
+        
+        session, chassis, body = bundle
+        
+        # Both read the catalog, which may wait on Supabase after an invalidation
+        warnings = await asyncio.to_thread(quote_warnings, chassis, body)
+        row = await asyncio.to_thread(new_quote_row, data, chassis, body)
+        
+        client = await get_async_supabase()
+        response = await client.table('quotes').insert(row).execute()
+        
+        if response.data:
+            result = await asyncio.to_thread(quote_created, data, response.data[0], session, chassis, body, warnings)
+            return app.json(result, 201)
+        else:
+            return app.json({'error': 'Failed to create quote'}, 500)
+        
+    except Exception as e:
+        print(f"Quote creation error: {e}")
+        return app.json({'error': 'Failed to create quote'}, 500)
+
+async def download_quote_pdf(app, request, quote_id):
+    try:
+        bundle = await load_quote_bundle_async(quote_id)
+        
+        if bundle is None:
+            return app.json({'error': 'Quote not found'}, 404)
+        
+        quote, session, chassis_data, body_data = bundle
+        
+        cache_key = quote_pdf_cache_key(quote, session, chassis_data, body_data)
+        if request.if_none_match.contains_weak(cache_key):
+            # Answered with the Flask route's headers, without rendering
+            return AsyncResponse.from_response(quote_pdf_response(b'', quote, cache_key, request.environ))
+        
+        # The cache may read from disk and rendering is CPU work, keep both off the event loop
+        pdf_data = await asyncio.to_thread(pdf_cache.get, cache_key)
+        if pdf_data is None:
+            pdf_data = await asyncio.to_thread(pdf_render_queue.render, quote_id, bundle)
+        
+        return AsyncResponse.from_response(quote_pdf_response(pdf_data, quote, cache_key, request.environ))
+        
+    except Exception as e:
+        print(f"PDF generation error: {e}")
+        return app.json({'error': 'Failed to generate PDF'}, 500)
+
+async def get_session_pricing(app, request, session_id):
+    try:
+        bundle = await load_session_bundle_async(session_id)
+        
+        if bundle is None:
+            return app.json({'error': 'Session not found'}, 404)
+        
+        session, chassis, body = bundle
+        
+        # The price table is rebuilt from the catalog after a reload
+        estimate = await asyncio.to_thread(pricing_engine.price_selection, chassis, body)
+        return app.json(dict(estimate, sessionId=session_id))
+        
+    except Exception as e:
+        print(f"Pricing calculation error: {e}")
+        return app.json({'error': 'Failed to calculate pricing'}, 500)
+
+async def get_session(app, request, session_id):
+    try:
+        if SELECTION_WRITE_BEHIND:
+            await asyncio.to_thread(flush_session_selections, session_id)
+        
+        session = await get_session_async(session_id)
+        
+        if session is None:
+            return app.json({'error': 'Session not found'}, 404)
+        
+        return app.json(session_to_dict(session))
+        
+    except Exception as e:
+        print(f"Session query error: {e}")
+        return app.json({'error': 'Failed to fetch session'}, 500)
+
+async_url_map = Map([
+    Rule('/api/quotes', endpoint=create_quote, methods=['POST']),
+    Rule('/api/quotes/<quote_id>/pdf', endpoint=download_quote_pdf, methods=['GET']),
+    Rule('/api/pricing/sessions/<session_id>', endpoint=get_session_pricing, methods=['GET']),
+    Rule('/api/configurations/sessions/<session_id>', endpoint=get_session, methods=['GET'])
+])
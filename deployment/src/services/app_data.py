@@ -0,0 +1,17 @@
+import os
+
+# Private directory for files the app writes for itself (session cache,
+# catalog snapshot), never a shared /tmp path another user could create first
+APP_DATA_DIR = os.environ.get('APP_DATA_DIR') or os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'),
+    'endera'
+)
+
+
+def app_data_path(name):
+    return os.path.join(APP_DATA_DIR, name)
+
+
+def ensure_parent_dir(path):
+    # Directories created here are readable by the app's user only
+    os.makedirs(os.path.dirname(os.path.abspath(path)), mode=0o700, exist_ok=True)
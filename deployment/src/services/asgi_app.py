@@ -0,0 +1,134 @@
+import json
+import time
+from urllib.parse import parse_qsl
+from werkzeug.datastructures import Headers, MultiDict
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import parse_etags
+from src.services.metrics import METRICS_ENABLED, record_request
+
+
+class AsyncRequest:
+    # The parts of an ASGI HTTP scope the async handlers need
+
+    def __init__(self, scope, receive):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'').decode('latin-1')
+        self.args = MultiDict(parse_qsl(self.query_string, keep_blank_values=True))
+        self.headers = Headers([(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']])
+        self._receive = receive
+        self._body = None
+
+    async def body(self):
+        if self._body is None:
+            chunks = []
+            while True:
+                message = await self._receive()
+                chunks.append(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            self._body = b''.join(chunks)
+        return self._body
+
+    async def get_json(self):
+        body = await self.body()
+        if not body:
+            return None
+        try:
+            return json.loads(body)
+        except ValueError:
+            return None
+
+    @property
+    def if_none_match(self):
+        return parse_etags(self.headers.get('If-None-Match'))
+
+    @property
+    def environ(self):
+        # Enough of a WSGI environ for werkzeug's conditional and range handling
+        environ = {
+            'REQUEST_METHOD': self.method,
+            'PATH_INFO': self.path,
+            'QUERY_STRING': self.query_string
+        }
+        for name, value in self.headers.items():
+            key = name.upper().replace('-', '_')
+            environ[key if key in ('CONTENT_TYPE', 'CONTENT_LENGTH') else f'HTTP_{key}'] = value
+        return environ
+
+
+class AsyncResponse:
+    def __init__(self, body=b'', status=200, headers=None, mimetype='application/json'):
+        self.body = body
+        self.status = status
+        self.headers = Headers(headers or [])
+        if mimetype and 'Content-Type' not in self.headers:
+            self.headers['Content-Type'] = mimetype
+
+    @classmethod
+    def from_response(cls, response):
+        # A buffered werkzeug response, e.g. one built by a Flask view's helper.
+        # Werkzeug only drops the body of a 304 when it is sent, so do it here.
+        body = b'' if response.status_code in (204, 304) else b''.join(response.iter_encoded())
+        return cls(body, response.status_code, list(response.headers.items()), mimetype=None)
+
+    async def send(self, send, head=False):
+        self.headers['Content-Length'] = str(len(self.body))
+        await send({
+            'type': 'http.response.start',
+            'status': self.status,
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in self.headers.items()]
+        })
+        await send({'type': 'http.response.body', 'body': b'' if head else self.body})
+
+
+class AsyncApp:
+    # ASGI app that runs async handlers for the routes in url_map and hands
+    # every other request (and other methods on those paths) to fallback,
+    # normally the Flask app wrapped with a2wsgi's WSGIMiddleware.
+
+    def __init__(self, url_map, fallback, encode_json, response_headers=None, on_startup=None, on_shutdown=None):
+        self.url_map = url_map
+        self.fallback = fallback
+        self.encode_json = encode_json
+        self.response_headers = response_headers or {}
+        self.on_startup = on_startup
+        self.on_shutdown = on_shutdown
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if scope['type'] != 'http':
+            return await self.fallback(scope, receive, send)
+
+        adapter = self.url_map.bind('localhost')
+        try:
+            rule, view_args = adapter.match(scope['path'], method=scope['method'], return_rule=True)
+        except HTTPException:
+            # Not found, other methods and slash redirects are Flask's business
+            return await self.fallback(scope, receive, send)
+
+        start = time.perf_counter()
+        response = await rule.endpoint(self, AsyncRequest(scope, receive), **view_args)
+        for name, value in self.response_headers.items():
+            response.headers.setdefault(name, value)
+        await response.send(send, head=scope['method'] == 'HEAD')
+        if METRICS_ENABLED:
+            # Same series as the Flask routes, the rules use the same paths
+            record_request(scope['method'], rule.rule, response.status, time.perf_counter() - start)
+
+    def json(self, obj, status=200):
+        return AsyncResponse(self.encode_json(obj) + b'\n', status=status)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                if self.on_startup:
+                    await self.on_startup()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.on_shutdown:
+                    await self.on_shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
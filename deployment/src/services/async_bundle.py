@@ -0,0 +1,106 @@
+import asyncio
+from postgrest.exceptions import APIError
+from src.services import quote_bundle
+from src.services.async_supabase import get_async_supabase
+from src.services.catalog_cache import catalog_cache
+from src.services.quote_bundle import SESSION_SELECT, QUOTE_SELECT, EMBEDDING_ERRORS, split_session
+from src.services.selection_buffer import SELECTION_WRITE_BEHIND, flush_session_selections
+from src.services.session_store import session_store
+
+# Async twins of quote_bundle's loaders for the ASGI entry point. Lookups that
+# do not depend on each other are awaited together instead of using a thread pool.
+
+
+async def load_session_bundle_async(session_id):
+    # Returns (session, chassis, body) or None when the session does not exist
+    if SELECTION_WRITE_BEHIND:
+        await asyncio.to_thread(flush_session_selections, session_id)
+
+    client = await get_async_supabase()
+    if quote_bundle.embedding_enabled and not session_store.enabled:
+        try:
+            response = await client.table('configuration_sessions').select(SESSION_SELECT).eq('id', session_id).execute()
+            if not response.data:
+                return None
+            return split_session(response.data[0])
+        except APIError as e:
+            if e.code not in EMBEDDING_ERRORS:
+                raise
+            print(f"Session embedding unavailable, using separate lookups: {e.message}")
+            quote_bundle.embedding_enabled = False
+
+    session = await get_session_async(session_id)
+    if session is None:
+        return None
+    chassis, body = await load_selected_items_async(session)
+    return session, chassis, body
+
+
+async def load_quote_bundle_async(quote_id):
+    # Returns (quote, session, chassis, body) or None when the quote does not exist
+    client = await get_async_supabase()
+    if quote_bundle.embedding_enabled:
+        try:
+            response = await client.table('quotes').select(QUOTE_SELECT).eq('id', quote_id).execute()
+            if not response.data:
+                return None
+            quote = dict(response.data[0])
+            session, chassis, body = split_session(quote.pop('session', None) or {})
+            return quote, session, chassis, body
+        except APIError as e:
+            if e.code not in EMBEDDING_ERRORS:
+                raise
+            print(f"Quote embedding unavailable, using separate lookups: {e.message}")
+            quote_bundle.embedding_enabled = False
+
+    quote = await fetch_row_async('quotes', quote_id)
+    if not quote:
+        return None
+
+    session = {}
+    if quote.get('session_id'):
+        session = await get_session_async(quote['session_id']) or {}
+
+    chassis, body = await load_selected_items_async(session)
+    return quote, session, chassis, body
+
+
+async def get_session_async(session_id):
+    # session_store.get with the read-through fetch done on the event loop
+    if not session_store.enabled:
+        return await fetch_row_async('configuration_sessions', session_id) or None
+
+    # The SQLite backend does file I/O, both calls run in a thread
+    version, row = await asyncio.to_thread(session_store.lookup, session_id)
+    if row is None:
+        row = await fetch_row_async('configuration_sessions', session_id) or None
+        await asyncio.to_thread(session_store.fill, session_id, row, version)
+    return row
+
+
+async def load_selected_items_async(session):
+    chassis_id = session.get('selected_chassis_id')
+    body_id = session.get('selected_body_id')
+
+    # A cold or just-invalidated catalog waits on Supabase, not on the event loop
+    snapshot = await asyncio.to_thread(catalog_cache.get)
+    chassis = snapshot.chassis_rows_by_id.get(str(chassis_id), {}) if chassis_id else {}
+    body = snapshot.body_rows_by_id.get(str(body_id), {}) if body_id else {}
+
+    # Rows the snapshot does not know yet are fetched concurrently
+    if chassis_id and not chassis and body_id and not body:
+        chassis, body = await asyncio.gather(
+            fetch_row_async('chassis', chassis_id),
+            fetch_row_async('body_configurations', body_id)
+        )
+    elif chassis_id and not chassis:
+        chassis = await fetch_row_async('chassis', chassis_id)
+    elif body_id and not body:
+        body = await fetch_row_async('body_configurations', body_id)
+    return chassis, body
+
+
+async def fetch_row_async(table, row_id):
+    client = await get_async_supabase()
+    response = await client.table(table).select('*').eq('id', row_id).execute()
+    return response.data[0] if response.data else {}
@@ -0,0 +1,33 @@
+import asyncio
+from supabase import acreate_client, AsyncClient
+from supabase.lib.client_options import AsyncClientOptions
+from src.services.supabase_client import SUPABASE_URL, SUPABASE_KEY, create_async_http_client
+
+# One client per process, created on the event loop that first needs it
+async_supabase: AsyncClient = None
+async_http_client = None
+_create_lock = None
+
+
+async def get_async_supabase():
+    global async_supabase, async_http_client, _create_lock
+    if async_supabase is not None:
+        return async_supabase
+
+    if _create_lock is None:
+        _create_lock = asyncio.Lock()
+    async with _create_lock:
+        if async_supabase is None:
+            async_http_client = create_async_http_client()
+            async_supabase = await acreate_client(
+                SUPABASE_URL, SUPABASE_KEY, AsyncClientOptions(httpx_client=async_http_client)
+            )
+    return async_supabase
+
+
+async def close_async_supabase():
+    global async_supabase, async_http_client
+    if async_http_client is not None:
+        await async_http_client.aclose()
+    async_supabase = None
+    async_http_client = None
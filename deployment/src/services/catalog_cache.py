@@ -0,0 +1,241 @@
+import os
+import threading
+import time
+from src.services.supabase_client import supabase
+from src.services.catalog_index import BodyIndex
+from src.services.compatibility import CompatibilityIndex
+from src.services.pagination import CodeOrder
+from src.services.catalog_store import CATALOG_SNAPSHOT_PATH, save_catalog_snapshot, load_catalog_snapshot
+from src.services.circuit_breaker import CircuitBreaker
+
+# Seconds a loaded catalog is served before a background refresh is started
+CATALOG_CACHE_TTL = float(os.environ.get('CATALOG_CACHE_TTL', '300'))
+# Longest a request waits on Supabase for the catalog when an older copy could
+# be served instead. Slower loads count as failures for the breaker.
+CATALOG_UPSTREAM_BUDGET = float(os.environ.get('CATALOG_UPSTREAM_BUDGET', '2'))
+# Consecutive failed or over-budget loads before Supabase is left alone
+CATALOG_BREAKER_THRESHOLD = int(os.environ.get('CATALOG_BREAKER_THRESHOLD', '3'))
+CATALOG_BREAKER_COOLDOWN = float(os.environ.get('CATALOG_BREAKER_COOLDOWN', '30'))
+
+# Whole rows, as the quote path reads them: compatibility rules use columns
+# (max_body_length_ft, curb_weight_lbs) that chassis_to_dict() leaves out
+CHASSIS_COLUMNS = '*'
+
+
+def chassis_to_dict(chassis):
+    return {
+        'id': chassis['id'],
+        'code': chassis['chassis_code'],
+        'name': f"{chassis['series']} {chassis['wheelbase_inches']}\" Wheelbase {chassis['drivetrain']} {chassis['body_style']}",
+        'series': chassis['series'],
+        'modelYear': chassis['model_year'],
+        'wheelbase': chassis['wheelbase_inches'],
+        'gvwr': chassis['gvwr_lbs'],
+        'engine': chassis['engine_type'],
+        'fuelType': chassis['fuel_type'],
+        'drivetrain': chassis['drivetrain'],
+        'bodyStyle': chassis['body_style'],
+        'msrp': float(chassis['msrp']) if chassis['msrp'] else 0,
+        'destinationCharge': float(chassis['destination_charge']) if chassis['destination_charge'] else 0,
+        'totalPrice': float(chassis['msrp'] or 0) + float(chassis['destination_charge'] or 0)
+    }
+
+
+def body_to_dict(body):
+    return {
+        'id': body['id'],
+        'name': body['configuration_name'],
+        'code': body['configuration_code'],
+        'description': body['description'],
+        'fuelType': body['fuel_type'],
+        'length': body['length_ft'],
+        'passengers': body['passenger_capacity'],
+        'wheelchairPositions': body['wheelchair_positions'],
+        'range': body['electric_range_miles'],
+        'price': 'Contact for pricing'
+    }
+
+
+# Keys of the API dicts above, accepted by the fields= parameter
+CHASSIS_FIELDS = (
+    'id', 'code', 'name', 'series', 'modelYear', 'wheelbase', 'gvwr', 'engine',
+    'fuelType', 'drivetrain', 'bodyStyle', 'msrp', 'destinationCharge', 'totalPrice'
+)
+BODY_FIELDS = (
+    'id', 'name', 'code', 'description', 'fuelType', 'length', 'passengers',
+    'wheelchairPositions', 'range', 'price'
+)
+
+
+class CatalogSnapshot:
+    # Immutable view of the chassis and body catalog as loaded from Supabase.
+    # Raw rows are kept next to the API dicts so other modules can reuse them.
+
+    def __init__(self, chassis_rows, body_rows, version, loaded_at=None, source='supabase'):
+        self.version = version
+        self.loaded_at = loaded_at or time.time()
+        # supabase, or file when read back from the local snapshot
+        self.source = source
+        self.chassis_rows = chassis_rows
+        self.body_rows = body_rows
+        self.chassis = [chassis_to_dict(chassis) for chassis in chassis_rows]
+        self.bodies = [body_to_dict(body) for body in body_rows]
+        self.chassis_rows_by_id = {str(chassis['id']): chassis for chassis in chassis_rows}
+        self.body_rows_by_id = {str(body['id']): body for body in body_rows}
+        self.chassis_by_id = {str(chassis['id']): chassis for chassis in self.chassis}
+        self.bodies_by_id = {str(body['id']): body for body in self.bodies}
+        self.chassis_order = CodeOrder(chassis_rows, 'chassis_code')
+        self.body_order = CodeOrder(body_rows, 'configuration_code')
+        self.body_index = BodyIndex(body_rows)
+        self.compatibility = CompatibilityIndex(chassis_rows, body_rows)
+
+    def age(self):
+        return time.time() - self.loaded_at
+
+
+class CatalogCache:
+    # Serves the last loaded snapshot and refreshes it in the background once
+    # it is older than the TTL (stale-while-revalidate). Every load is also
+    # written to the snapshot file, which a new process starts from instead
+    # of waiting on Supabase. After an invalidation callers wait up to the
+    # upstream budget for fresh rows, then get the previous catalog while the
+    # load finishes. Only a process with neither blocks on Supabase.
+
+    def __init__(self, ttl=CATALOG_CACHE_TTL, budget=CATALOG_UPSTREAM_BUDGET,
+                 breaker=None, snapshot_path=CATALOG_SNAPSHOT_PATH):
+        self.ttl = ttl
+        self.budget = budget
+        self.breaker = breaker or CircuitBreaker(CATALOG_BREAKER_THRESHOLD, CATALOG_BREAKER_COOLDOWN)
+        self.snapshot_path = snapshot_path
+        self._snapshot = None
+        self._fallback = None
+        self._file_checked = False
+        self._version = 0
+        self._generation = 0
+        self._refreshing = None
+        self._state_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    def get(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return self._load_blocking()
+
+        if snapshot.age() >= self.ttl:
+            self._refresh_in_background()
+
+        return snapshot
+
+    def refresh(self):
+        with self._state_lock:
+            generation = self._generation
+
+        start = time.monotonic()
+        try:
+            chassis_rows = supabase.table('chassis').select(CHASSIS_COLUMNS).execute().data
+            body_rows = supabase.table('body_configurations').select('*').execute().data
+        except Exception:
+            self.breaker.failure()
+            raise
+        if time.monotonic() - start > self.budget:
+            self.breaker.failure()
+        else:
+            self.breaker.success()
+
+        with self._state_lock:
+            self._version += 1
+            snapshot = CatalogSnapshot(chassis_rows, body_rows, self._version)
+            # Rows read before an invalidation must not be installed after it
+            installed = generation == self._generation
+            if installed:
+                self._snapshot = snapshot
+
+        if installed:
+            try:
+                save_catalog_snapshot(chassis_rows, body_rows, snapshot.loaded_at, self.snapshot_path)
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Catalog snapshot save error: {e}")
+        return snapshot
+
+    def invalidate(self):
+        with self._state_lock:
+            self._generation += 1
+            if self._snapshot is not None:
+                self._fallback = self._snapshot
+            self._snapshot = None
+
+    def _load_blocking(self):
+        with self._load_lock:
+            # Another request may have finished the load while we waited
+            snapshot = self._snapshot
+            if snapshot is not None:
+                return snapshot
+
+            if not self._file_checked:
+                # Start from the file and bring it up to date in the background
+                self._file_checked = True
+                snapshot = self._load_file()
+                if snapshot is not None:
+                    self._install(snapshot)
+                    self._refresh_in_background()
+                    return snapshot
+
+            if self._fallback is None:
+                # Nothing older to serve, wait for Supabase
+                return self.refresh()
+
+            done = self._refresh_in_background()
+            if done is not None:
+                done.wait(self.budget)
+            snapshot = self._snapshot
+            if snapshot is None:
+                # Supabase is down, slow or skipped by the breaker, serve the previous catalog
+                snapshot = self._install(self._fallback)
+            return snapshot
+
+    def _load_file(self):
+        try:
+            loaded = load_catalog_snapshot(self.snapshot_path)
+        except Exception as e:
+            print(f"Catalog snapshot load error: {e}")
+            return None
+        if loaded is None:
+            return None
+        chassis_rows, body_rows, loaded_at = loaded
+        with self._state_lock:
+            self._version += 1
+            return CatalogSnapshot(chassis_rows, body_rows, self._version, loaded_at=loaded_at, source='file')
+
+    def _install(self, snapshot):
+        # Only fills an empty cache, a finished refresh always wins
+        with self._state_lock:
+            if self._snapshot is None:
+                self._snapshot = snapshot
+            return self._snapshot
+
+    def _refresh_in_background(self):
+        # Returns an event set when the refresh ends, None while the breaker is open
+        with self._state_lock:
+            if self._refreshing is not None:
+                return self._refreshing
+            if not self.breaker.allow():
+                return None
+            done = self._refreshing = threading.Event()
+
+        thread = threading.Thread(target=self._background_refresh, args=(done,), name='catalog-refresh', daemon=True)
+        thread.start()
+        return done
+
+    def _background_refresh(self, done):
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the stale snapshot, the next stale read retries
+            print(f"Catalog refresh error: {e}")
+        finally:
+            with self._state_lock:
+                self._refreshing = None
+            done.set()
+
+
+catalog_cache = CatalogCache()
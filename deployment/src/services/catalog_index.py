@@ -0,0 +1,151 @@
+from bisect import bisect_left, bisect_right
+
+
+class SortedColumn:
+    # Row positions ordered by one column, answering range filters with bisect.
+    # Rows without a value are kept apart so they sort last and never match a range.
+    # Ties are ordered by id so keyset cursors stay valid across catalog reloads.
+
+    def __init__(self, rows, key, default=None):
+        pairs = []
+        missing = []
+        self.by_position = []
+        for position, row in enumerate(rows):
+            value = row.get(key)
+            if value is None:
+                value = default
+            self.by_position.append(value)
+            if value is None:
+                missing.append((str(row['id']), position))
+            else:
+                pairs.append((value, str(row['id']), position))
+
+        pairs.sort()
+        missing.sort()
+        self.values = [value for value, _, _ in pairs]
+        self.positions = [position for _, _, position in pairs]
+        self.missing = [position for _, position in missing]
+
+    def between(self, low=None, high=None):
+        start = bisect_left(self.values, low) if low is not None else 0
+        end = bisect_right(self.values, high) if high is not None else len(self.values)
+        return self.positions[start:end]
+
+    def ordered(self, descending=False):
+        positions = self.positions[::-1] if descending else self.positions
+        return positions + self.missing
+
+
+class BodyIndex:
+    # Columnar view of body_configurations rows for the catalog search page
+
+    SORT_COLUMNS = {
+        'code': 'configuration_code',
+        'name': 'configuration_name',
+        'passengers': 'passenger_capacity',
+        'length': 'length_ft',
+        'range': 'electric_range_miles'
+    }
+
+    def __init__(self, body_rows):
+        self.size = len(body_rows)
+        self.ids = [str(body['id']) for body in body_rows]
+
+        self.by_fuel_type = {}
+        for position, body in enumerate(body_rows):
+            self.by_fuel_type.setdefault(body.get('fuel_type'), []).append(position)
+
+        # A missing capacity counts as 0, as the catalog endpoint always did
+        self.passengers = SortedColumn(body_rows, 'passenger_capacity', default=0)
+        self.length = SortedColumn(body_rows, 'length_ft')
+        self.range = SortedColumn(body_rows, 'electric_range_miles')
+        self.sort_columns = {
+            'code': SortedColumn(body_rows, 'configuration_code', default=''),
+            'name': SortedColumn(body_rows, 'configuration_name'),
+            'passengers': self.passengers,
+            'length': self.length,
+            'range': self.range
+        }
+
+    def query(self, fuel_type=None, min_passengers=None, max_passengers=None,
+              min_length=None, max_length=None, min_range=None, max_range=None,
+              sort=None, descending=False, offset=0, limit=None, positions=None, after=None):
+        # Returns (total matches, row positions of the requested page, sort key
+        # of its last row when more rows follow). after is such a sort key.
+        matches = []
+        if positions is not None:
+            matches.append(positions)
+        if fuel_type and fuel_type != 'all':
+            matches.append(self.by_fuel_type.get(fuel_type, []))
+        if min_passengers is not None or max_passengers is not None:
+            matches.append(self.passengers.between(min_passengers, max_passengers))
+        if min_length is not None or max_length is not None:
+            matches.append(self.length.between(min_length, max_length))
+        if min_range is not None or max_range is not None:
+            matches.append(self.range.between(min_range, max_range))
+
+        if sort:
+            ordered = self.sort_columns[sort].ordered(descending)
+        else:
+            # Catalog order, pages are always sorted (by code unless asked otherwise)
+            ordered = range(self.size)
+
+        if matches:
+            # Intersect starting from the most selective filter
+            matches.sort(key=len)
+            selected = set(matches[0])
+            for positions in matches[1:]:
+                selected.intersection_update(positions)
+            ordered = [position for position in ordered if position in selected]
+        else:
+            ordered = list(ordered)
+
+        total = len(ordered)
+        if after is not None:
+            ordered = ordered[self.seek(ordered, after, sort, descending):]
+
+        end = offset + limit if limit is not None else len(ordered)
+        page = ordered[offset:end]
+        next_key = self.sort_key(page[-1], sort) if page and end < len(ordered) else None
+        return total, page, next_key
+
+    def sort_key(self, position, sort):
+        # [no value, value, id] of a row in the given sort order
+        value = self.sort_columns[sort].by_position[position]
+        return [value is None, value, self.ids[position]]
+
+    def seek(self, ordered, after, sort, descending):
+        # Index of the first row past the cursor, found by bisection
+        low, high = 0, len(ordered)
+        while low < high:
+            middle = (low + high) // 2
+            if follows(self.sort_key(ordered[middle], sort), after, descending):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def valid_cursor(self, after, sort):
+        # A decoded cursor must be comparable with the keys of this sort
+        missing, value, row_id = after
+        if not isinstance(missing, bool) or not isinstance(row_id, str):
+            return False
+        if missing:
+            return value is None
+        if sort in ('code', 'name'):
+            return isinstance(value, str)
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def follows(key, cursor, descending):
+    missing, value, row_id = key
+    cursor_missing, cursor_value, cursor_id = cursor
+    if missing != cursor_missing:
+        # Rows without a value come last in both directions
+        return missing
+    if missing or value == cursor_value:
+        # Ties keep id order, reversed along with the rest of a descending sort
+        if descending and not missing:
+            return row_id < cursor_id
+        return row_id > cursor_id
+    return value < cursor_value if descending else value > cursor_value
@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import time
+from src.services.app_data import app_data_path, ensure_parent_dir
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Last good catalog, written after every load from Supabase and read at
+# startup. Empty disables the file.
+CATALOG_SNAPSHOT_PATH = os.environ.get('CATALOG_SNAPSHOT_PATH', app_data_path('catalog.snapshot'))
+# Older snapshots are ignored at startup, the catalog is loaded from Supabase
+CATALOG_SNAPSHOT_MAX_AGE = float(os.environ.get('CATALOG_SNAPSHOT_MAX_AGE', '86400'))
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def encode_snapshot(payload):
+    # msgpack when installed, JSON otherwise. Both are read back by decode_snapshot.
+    if msgpack is not None:
+        return msgpack.packb(payload, default=str)
+    return json.dumps(payload, default=str, separators=(',', ':')).encode('utf-8')
+
+
+def decode_snapshot(data):
+    if data[:1] == b'{':
+        return json.loads(data)
+    if msgpack is None:
+        raise ValueError('msgpack snapshot but msgpack is not installed')
+    return msgpack.unpackb(data)
+
+
+def save_catalog_snapshot(chassis_rows, body_rows, loaded_at, path=CATALOG_SNAPSHOT_PATH):
+    if not path:
+        return
+    payload = {
+        'format': SNAPSHOT_FORMAT_VERSION,
+        'loadedAt': loaded_at,
+        'chassis': chassis_rows,
+        'bodies': body_rows
+    }
+    data = encode_snapshot(payload)
+
+    # Written next to the target and renamed, so readers never see half a file
+    directory = os.path.dirname(os.path.abspath(path))
+    ensure_parent_dir(path)
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.catalog-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+def load_catalog_snapshot(path=CATALOG_SNAPSHOT_PATH, max_age=CATALOG_SNAPSHOT_MAX_AGE):
+    # Returns (chassis_rows, body_rows, loaded_at), or None without a usable
+    # file. Both the recorded load time and the file's mtime must be recent.
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        oldest = time.time() - max_age
+        if os.fstat(f.fileno()).st_mtime < oldest:
+            print(f"Catalog snapshot ignored, older than {max_age:.0f}s: {path}")
+            return None
+        payload = decode_snapshot(f.read())
+    if payload.get('format') != SNAPSHOT_FORMAT_VERSION:
+        return None
+    loaded_at = payload.get('loadedAt')
+    if not isinstance(loaded_at, (int, float)) or not oldest <= loaded_at <= time.time() + 60:
+        print(f"Catalog snapshot ignored, loaded at {loaded_at}: {path}")
+        return None
+    return payload['chassis'], payload['bodies'], loaded_at
@@ -0,0 +1,90 @@
+import os
+
+# Longest body (ft) per inch of wheelbase. The longest pairing the catalog
+# sells is the 25 ft body on the 138" E-350, 0.181.
+COMPAT_MAX_BODY_FT_PER_WHEELBASE_IN = float(os.environ.get('COMPAT_MAX_BODY_FT_PER_WHEELBASE_IN', '0.19'))
+# Per seat, added to curb and body weight for the GVWR check
+COMPAT_PASSENGER_WEIGHT_LBS = float(os.environ.get('COMPAT_PASSENGER_WEIGHT_LBS', '175'))
+
+
+def is_compatible(chassis, body):
+    # Rules read whole chassis and body rows. A rule whose columns are missing
+    # passes, nothing is estimated.
+    wheelbase = chassis.get('wheelbase_inches')
+    length = body.get('length_ft')
+    if wheelbase and length:
+        wheelbase = float(wheelbase)
+        length = float(length)
+        # The body has to reach past the rear axle, and overhang it by no more
+        # than the catalog's longest pairing
+        if length * 12 <= wheelbase:
+            return False
+        if length > wheelbase * COMPAT_MAX_BODY_FT_PER_WHEELBASE_IN:
+            return False
+
+    max_length = chassis.get('max_body_length_ft')
+    if max_length and length and float(length) > float(max_length):
+        return False
+
+    gvwr = chassis.get('gvwr_lbs')
+    curb_weight = chassis.get('curb_weight_lbs')
+    body_weight = body.get('body_weight_lbs')
+    if gvwr and curb_weight and body_weight:
+        passenger_weight = (body.get('passenger_capacity') or 0) * COMPAT_PASSENGER_WEIGHT_LBS
+        if float(curb_weight) + float(body_weight) + passenger_weight > float(gvwr):
+            return False
+
+    return True
+
+
+class CompatibilityIndex:
+    # Chassis x body compatibility as one int bitset per row in each direction.
+    # Bit positions follow the snapshot's row order, so they can be combined
+    # with the catalog BodyIndex positions directly.
+
+    def __init__(self, chassis_rows, body_rows):
+        self.chassis_positions = {str(chassis['id']): i for i, chassis in enumerate(chassis_rows)}
+        self.body_positions = {str(body['id']): i for i, body in enumerate(body_rows)}
+        self.bodies_by_chassis = [0] * len(chassis_rows)
+        self.chassis_by_body = [0] * len(body_rows)
+
+        for i, chassis in enumerate(chassis_rows):
+            for j, body in enumerate(body_rows):
+                if is_compatible(chassis, body):
+                    self.bodies_by_chassis[i] |= 1 << j
+                    self.chassis_by_body[j] |= 1 << i
+
+        self.buildable_bodies = 0
+        for mask in self.bodies_by_chassis:
+            self.buildable_bodies |= mask
+
+    def compatible(self, chassis_id, body_id):
+        i = self.chassis_positions.get(str(chassis_id))
+        j = self.body_positions.get(str(body_id))
+        if i is None or j is None:
+            return None
+        return bool(self.bodies_by_chassis[i] >> j & 1)
+
+    def body_positions_for(self, chassis_id):
+        i = self.chassis_positions.get(str(chassis_id))
+        if i is None:
+            return None
+        return bit_positions(self.bodies_by_chassis[i])
+
+    def chassis_positions_for(self, body_id):
+        j = self.body_positions.get(str(body_id))
+        if j is None:
+            return None
+        return bit_positions(self.chassis_by_body[j])
+
+    def buildable_body_positions(self):
+        return bit_positions(self.buildable_bodies)
+
+
+def bit_positions(mask):
+    positions = []
+    while mask:
+        low = mask & -mask
+        positions.append(low.bit_length() - 1)
+        mask ^= low
+    return positions
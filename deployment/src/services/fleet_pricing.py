@@ -0,0 +1,193 @@
+import math
+import threading
+from src.services.catalog_cache import catalog_cache
+from src.services.pricing_engine import pricing_engine, whole_quantity
+
+# Usage assumptions applied when the request leaves them out
+DEFAULT_ASSUMPTIONS = {
+    'annualMiles': 25000,
+    'years': 8,
+    'operatingDaysPerYear': 250,
+    'electricityCostPerKwh': 0.15,
+    'kwhPerMile': 1.2,
+    'fuelCostPerGallon': 3.75,
+    'milesPerGallon': 10,
+    'maintenancePerMileElectric': 0.25,
+    'maintenancePerMileFuel': 0.45
+}
+
+# Divisors and multipliers of lifetime miles, zero would divide by zero
+POSITIVE_ASSUMPTIONS = {'annualMiles', 'years', 'operatingDaysPerYear', 'milesPerGallon'}
+
+RANK_METRICS = {
+    'unitPrice': 'unit_price',
+    'fleetPrice': 'fleet_price',
+    'costPerSeat': 'cost_per_seat',
+    'tcoPerVehicle': 'tco_per_vehicle',
+    'fleetTco': 'fleet_tco',
+    'tcoPerSeat': 'tco_per_seat',
+    'tcoPerMile': 'tco_per_mile'
+}
+
+
+class FleetArrays:
+    # Catalog columns as NumPy arrays, one row per chassis and per body.
+    # The extra last body row stands for "no body selected".
+
+    def __init__(self, snapshot, table):
+        # NumPy is imported by the first fleet comparison, not at startup
+        import numpy as np
+
+        self.version = snapshot.version
+        self.chassis_positions = {chassis_id: i for i, chassis_id in enumerate(table.chassis)}
+        self.body_positions = {body_id: i for i, body_id in enumerate(table.bodies)}
+
+        self.chassis_price = np.array([msrp + destination for msrp, destination in table.chassis.values()] or [0.0])
+        self.chassis_electric = np.array([
+            (snapshot.chassis_rows_by_id[chassis_id].get('fuel_type') or '').lower() == 'electric'
+            for chassis_id in table.chassis
+        ] or [False])
+
+        body_rows = [snapshot.body_rows_by_id[body_id] for body_id in table.bodies]
+        self.body_price = np.array([price for price, _ in table.bodies.values()] + [0.0])
+        self.body_seats = np.array([float(row.get('passenger_capacity') or 0) for row in body_rows] + [0.0])
+        self.body_range = np.array([float(row.get('electric_range_miles') or 0) for row in body_rows] + [0.0])
+        self.body_electric = np.array([(row.get('fuel_type') or '').lower() == 'electric' for row in body_rows] + [False])
+        self.no_body = len(body_rows)
+
+
+_arrays = None
+_arrays_lock = threading.Lock()
+
+
+def fleet_arrays():
+    global _arrays
+    snapshot = catalog_cache.get()
+    arrays = _arrays
+    if arrays is None or arrays.version != snapshot.version:
+        arrays = FleetArrays(snapshot, pricing_engine.table())
+        with _arrays_lock:
+            _arrays = arrays
+    return arrays
+
+
+def fleet_assumptions(assumptions=None):
+    # Defaults with the request's overrides, ValueError names the bad one
+    values = dict(DEFAULT_ASSUMPTIONS)
+    for key, value in (assumptions or {}).items():
+        if key not in DEFAULT_ASSUMPTIONS:
+            continue
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            raise ValueError(f'{key} must be a number')
+        if not math.isfinite(value):
+            raise ValueError(f'{key} must be a number')
+        if key in POSITIVE_ASSUMPTIONS and value <= 0:
+            raise ValueError(f'{key} must be greater than 0')
+        if value < 0:
+            raise ValueError(f'{key} must not be negative')
+        values[key] = value
+    return values
+
+
+def compare_fleet(candidates, assumptions=None, rank_by='tcoPerSeat'):
+    # candidates: [{'chassisId', 'bodyId', 'quantity'}]. Returns (results, errors);
+    # results are ranked, vehicles that cannot cover a day's miles go last.
+    values = fleet_assumptions(assumptions)
+
+    import numpy as np
+
+    arrays = fleet_arrays()
+    errors = []
+    chassis_index = []
+    body_index = []
+    quantities = []
+    valid = []
+    for index, candidate in enumerate(candidates):
+        chassis_position = arrays.chassis_positions.get(str(candidate.get('chassisId')))
+        body_id = candidate.get('bodyId')
+        body_position = arrays.body_positions.get(str(body_id)) if body_id else arrays.no_body
+        if chassis_position is None:
+            errors.append({'index': index, 'error': 'Chassis not found'})
+            continue
+        if body_position is None:
+            errors.append({'index': index, 'error': 'Body configuration not found'})
+            continue
+        try:
+            quantity = whole_quantity(candidate.get('quantity', 1), 'quantity')
+        except ValueError as e:
+            errors.append({'index': index, 'error': str(e)})
+            continue
+        chassis_index.append(chassis_position)
+        body_index.append(body_position)
+        quantities.append(quantity)
+        valid.append(index)
+
+    if not valid:
+        return [], errors
+
+    ci = np.array(chassis_index)
+    bi = np.array(body_index)
+    quantity = np.array(quantities, dtype=float)
+
+    unit_price = arrays.chassis_price[ci] + arrays.body_price[bi]
+    seats = arrays.body_seats[bi]
+    seats_or_nan = np.where(seats > 0, seats, np.nan)
+    electric = arrays.body_electric[bi] | arrays.chassis_electric[ci]
+
+    lifetime_miles = values['annualMiles'] * values['years']
+    energy_per_mile = np.where(
+        electric,
+        values['kwhPerMile'] * values['electricityCostPerKwh'],
+        values['fuelCostPerGallon'] / values['milesPerGallon']
+    )
+    maintenance_per_mile = np.where(electric, values['maintenancePerMileElectric'], values['maintenancePerMileFuel'])
+    operating_cost = (energy_per_mile + maintenance_per_mile) * lifetime_miles
+
+    daily_miles = values['annualMiles'] / values['operatingDaysPerYear']
+    meets_range = ~electric | (arrays.body_range[bi] >= daily_miles)
+
+    metrics = {
+        'unit_price': unit_price,
+        'fleet_price': unit_price * quantity,
+        'cost_per_seat': unit_price / seats_or_nan,
+        'operating_cost': operating_cost,
+        'tco_per_vehicle': unit_price + operating_cost,
+        'fleet_tco': (unit_price + operating_cost) * quantity,
+        'tco_per_seat': (unit_price + operating_cost) / seats_or_nan,
+        'tco_per_mile': (unit_price + operating_cost) / lifetime_miles,
+        'fleet_seats': seats * quantity
+    }
+
+    # Feasible first, then by the metric with missing values (no seats) last
+    ranked_metric = metrics[RANK_METRICS[rank_by]]
+    order = np.lexsort((np.nan_to_num(ranked_metric, nan=np.inf), ~meets_range))
+
+    results = []
+    for rank, position in enumerate(order.tolist(), start=1):
+        candidate = candidates[valid[position]]
+        results.append({
+            'rank': rank,
+            'index': valid[position],
+            'chassisId': candidate.get('chassisId'),
+            'bodyId': candidate.get('bodyId'),
+            'quantity': int(quantity[position]),
+            'electric': bool(electric[position]),
+            'meetsDailyRange': bool(meets_range[position]),
+            'unitPrice': to_number(metrics['unit_price'][position]),
+            'fleetPrice': to_number(metrics['fleet_price'][position]),
+            'costPerSeat': to_number(metrics['cost_per_seat'][position]),
+            'operatingCost': to_number(metrics['operating_cost'][position]),
+            'tcoPerVehicle': to_number(metrics['tco_per_vehicle'][position]),
+            'fleetTco': to_number(metrics['fleet_tco'][position]),
+            'tcoPerSeat': to_number(metrics['tco_per_seat'][position]),
+            'tcoPerMile': to_number(metrics['tco_per_mile'][position]),
+            'fleetSeats': to_number(metrics['fleet_seats'][position])
+        })
+    return results, errors
+
+
+def to_number(value):
+    value = float(value)
+    return None if math.isnan(value) else round(value, 2)
@@ -0,0 +1,90 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from flask import current_app, request
+
+# Upper bound on distinct cached bodies, query-string variants included
+JSON_CACHE_MAX_ENTRIES = 512
+
+
+def json_encoder(provider=None):
+    # Providers that encode straight to bytes skip the str round trip
+    provider = provider or current_app.json
+    dumps_bytes = getattr(provider, 'dumps_bytes', None)
+    if dumps_bytes is not None:
+        return dumps_bytes
+    return lambda obj: provider.dumps(obj).encode('utf-8')
+
+
+class JsonResponseCache:
+    # Serialized JSON bodies and their ETags for one catalog version. The
+    # whole cache is dropped as soon as a newer version is requested.
+
+    def __init__(self, max_entries=JSON_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key, version, build):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        # Encode outside the lock, a concurrent miss only costs a duplicate encode
+        body = json_encoder()(build()) + b'\n'
+        entry = (body, hashlib.sha256(body).hexdigest())
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+
+json_cache = JsonResponseCache()
+
+
+def cached_json_response(key, version, build):
+    body, etag = json_cache.get_or_build(key, version, build)
+
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(body, mimetype='application/json')
+
+    response.set_etag(etag)
+    # Let clients keep the body but revalidate it on every use
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson():
+    # Streaming is opt-in, */* and missing Accept headers still get JSON
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def ndjson_response(rows):
+    # One JSON document per line, encoded as the rows are produced
+    encode = json_encoder()
+
+    def generate():
+        for row in rows:
+            yield encode(row) + b'\n'
+
+    return current_app.response_class(generate(), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,46 @@
+import os
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson (used when installed) or default (the standard library encoder)
+JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'orjson')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    # Flask's provider with orjson doing the encoding. Keys stay sorted and
+    # dates still go through Flask's default so responses keep their format.
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, **kwargs).decode('utf-8')
+
+    def dumps_bytes(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+
+        # Anything beyond these (cls=, default=) needs the standard encoder
+        if set(kwargs) <= {'sort_keys', 'indent', 'separators', 'ensure_ascii'}:
+            try:
+                return orjson.dumps(obj, default=self.default, option=option)
+            except orjson.JSONEncodeError:
+                pass  # e.g. integers beyond 64 bits, the standard encoder copes
+        return super().dumps(obj, **kwargs).encode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype
+        )
+
+
+def create_json_provider(app, name=JSON_PROVIDER):
+    if name == 'orjson' and orjson is not None:
+        return OrjsonProvider(app)
+    return DefaultJSONProvider(app)
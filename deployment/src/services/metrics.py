@@ -0,0 +1,419 @@
+# Prometheus metrics kept in process memory. Under several workers each
+# process only counts its own requests, so a scrape would see whichever
+# worker answered it. With METRICS_MULTIPROC_DIR set, every process writes
+# its values to <dir>/<pid>.json every METRICS_WRITE_INTERVAL seconds and
+# /metrics serves the sum over all files, as prometheus_client's
+# multiprocess mode does. Empty the directory when the app is redeployed.
+import bisect
+import hmac
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, request
+from src.services.workers import configured_workers
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+# Share of requests that also record where their time went (Supabase, PDF,
+# JSON, compression). Request counts and latencies always cover every request.
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', '0.1'))
+# Send that breakdown to the client as a Server-Timing header on sampled responses
+METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', 'false').lower() == 'true'
+# /metrics needs Authorization: Bearer <token>. Without a token the route
+# only exists when METRICS_PUBLIC=true.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', 'false').lower() == 'true'
+# Directory shared by the workers of one host, see above
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_WRITE_INTERVAL = float(os.environ.get('METRICS_WRITE_INTERVAL', '5'))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CALL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names, values, extra=None):
+    pairs = [f'{name}="{escape_label(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def state(self):
+        with self._lock:
+            return dict(self._values)
+
+    def merge(self, states):
+        values = {}
+        for state in states:
+            for label_values, value in state.items():
+                values[label_values] = values.get(label_values, 0) + value
+        return values
+
+    def render(self, values=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        if values is None:
+            values = self.state()
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{format_labels(self.labels, label_values)} {value}')
+        return lines
+
+
+class Histogram:
+    # Per label set: one counter per bucket (not cumulative until rendered) and the sum
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def state(self):
+        with self._lock:
+            return {label_values: (list(counts), total) for label_values, (counts, total) in self._series.items()}
+
+    def merge(self, states):
+        series = {}
+        for state in states:
+            for label_values, (counts, total) in state.items():
+                merged = series.setdefault(label_values, ([0] * (len(self.buckets) + 1), 0.0))
+                series[label_values] = ([a + b for a, b in zip(merged[0], counts)], merged[1] + total)
+        return series
+
+    def render(self, series=None):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        if series is None:
+            series = self.state()
+        for label_values, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = format_labels(self.labels, label_values, f'le="{format_value(bound)}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = format_labels(self.labels, label_values)
+            lines.append(f'{self.name}_sum{labels} {total!r}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name, help_text, labels=()):
+        metric = Counter(name, help_text, labels)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        metric = Histogram(name, help_text, labels, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def dump(self):
+        # JSON-safe values of every metric, label tuples as lists
+        return {
+            metric.name: [[list(label_values), value] for label_values, value in metric.state().items()]
+            for metric in self.metrics
+        }
+
+    def render_merged(self, dumps):
+        lines = []
+        for metric in self.metrics:
+            states = [
+                {tuple(label_values): value for label_values, value in dump.get(metric.name, ())}
+                for dump in dumps
+            ]
+            lines.extend(metric.render(metric.merge(states)))
+        return '\n'.join(lines) + '\n'
+
+
+class MultiProcessWriter:
+    # Writes this process's values to <directory>/<pid>.json on an interval.
+    # Started lazily, so a worker forked from a preloaded app starts its own.
+
+    def __init__(self, registry, directory, interval=METRICS_WRITE_INTERVAL):
+        self.registry = registry
+        self.directory = directory
+        self.interval = interval
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def ensure_started(self):
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            os.makedirs(self.directory, exist_ok=True)
+            threading.Thread(target=self._run, name='metrics-writer', daemon=True).start()
+
+    def write(self):
+        path = os.path.join(self.directory, f'{os.getpid()}.json')
+        tmp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.registry.dump(), f)
+        os.replace(tmp_path, path)
+
+    def render(self):
+        # This process's current values plus the last write of every other
+        # process, including workers that have exited since
+        self.write()
+        dumps = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.json'):
+                continue
+            try:
+                with open(entry.path) as f:
+                    dumps.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+        return self.registry.render_merged(dumps)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.write()
+            except OSError as e:
+                print(f"Metrics write error: {e}")
+
+
+registry = MetricsRegistry()
+
+http_requests = registry.counter(
+    'endera_http_requests_total', 'Requests handled, by route and status.', ('method', 'route', 'status'))
+http_request_duration = registry.histogram(
+    'endera_http_request_duration_seconds', 'Time until the response was returned, by route.', ('method', 'route'))
+upstream_requests = registry.counter(
+    'endera_supabase_requests_total', 'Supabase REST calls sent upstream, by table and status.', ('method', 'table', 'status'))
+upstream_request_duration = registry.histogram(
+    'endera_supabase_request_duration_seconds', 'Supabase REST call time including retries.', ('method', 'table'))
+upstream_coalesced = registry.counter(
+    'endera_supabase_coalesced_total', 'Supabase reads answered by an identical call already in flight.', ('method', 'table'))
+pdf_render_duration = registry.histogram(
+    'endera_pdf_render_seconds', 'ReportLab render time.', ('kind',))
+pdf_queue_wait = registry.histogram(
+    'endera_pdf_queue_wait_seconds', 'Time a render waited for a free PDF worker.', ('kind',))
+request_phase_duration = registry.histogram(
+    'endera_request_phase_seconds', 'Sampled requests: time spent per phase.', ('route', 'phase'))
+request_upstream_calls = registry.histogram(
+    'endera_request_supabase_calls', 'Sampled requests: Supabase calls made while handling the request.',
+    ('route',), buckets=CALL_COUNT_BUCKETS)
+
+multiprocess_writer = MultiProcessWriter(registry, METRICS_MULTIPROC_DIR) if METRICS_MULTIPROC_DIR else None
+
+if METRICS_ENABLED and multiprocess_writer is None and configured_workers() != 1:
+    print("WARNING: /metrics only shows the worker that answers the scrape. "
+          "Set METRICS_MULTIPROC_DIR to serve the sum over all workers")
+
+
+class RequestTimings:
+    # The breakdown of one sampled request, kept on flask.g
+
+    def __init__(self):
+        self.phases = {}
+        self.upstream_calls = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            if phase == 'upstream':
+                self.upstream_calls += 1
+
+
+def current_timings():
+    # None outside a request and for requests that were not sampled
+    if not has_request_context():
+        return None
+    return g.get('request_timings')
+
+
+@contextmanager
+def request_phase(phase):
+    timings = current_timings()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(phase, time.perf_counter() - start)
+
+
+def upstream_table(url):
+    # /rest/v1/<table> for PostgREST, the service name (auth, storage) otherwise
+    parts = url.path.split('/')
+    if len(parts) > 3 and parts[1] == 'rest':
+        return parts[3]
+    return parts[1] if len(parts) > 1 and parts[1] else 'other'
+
+
+def record_upstream(response):
+    start = response.request.extensions.get('metrics_start')
+    if start is None:
+        return
+    elapsed = time.perf_counter() - start
+    method = response.request.method
+    table = upstream_table(response.request.url)
+    if response.extensions.get('coalesced'):
+        # Answered by another caller's call, Supabase never saw this one
+        upstream_coalesced.inc(method, table)
+    else:
+        upstream_requests.inc(method, table, str(response.status_code))
+        upstream_request_duration.observe(elapsed, method, table)
+
+    timings = current_timings()
+    if timings is not None:
+        timings.add('upstream', elapsed)
+
+
+def mark_upstream_start(request):
+    request.extensions['metrics_start'] = time.perf_counter()
+
+
+async def mark_upstream_start_async(request):
+    mark_upstream_start(request)
+
+
+async def record_upstream_async(response):
+    record_upstream(response)
+
+
+def upstream_event_hooks():
+    # httpx hooks for the Supabase client. The response hook runs once the
+    # headers are in, after any retries done by the transport.
+    if not METRICS_ENABLED:
+        return {}
+    return {'request': [mark_upstream_start], 'response': [record_upstream]}
+
+
+def async_upstream_event_hooks():
+    if not METRICS_ENABLED:
+        return {}
+    return {'request': [mark_upstream_start_async], 'response': [record_upstream_async]}
+
+
+def record_pdf_render(kind, submitted, started, seconds):
+    pdf_render_duration.observe(seconds, kind)
+    if submitted is not None:
+        pdf_queue_wait.observe(max(0.0, started - submitted), kind)
+
+
+def record_request(method, route, status, seconds):
+    if multiprocess_writer is not None:
+        multiprocess_writer.ensure_started()
+    http_requests.inc(method, route, str(status))
+    http_request_duration.observe(seconds, method, route)
+
+
+def request_route():
+    return request.url_rule.rule if request.url_rule is not None else 'unmatched'
+
+
+def start_request_timer():
+    g.request_start = time.perf_counter()
+    if random.random() < METRICS_SAMPLE_RATE:
+        g.request_timings = RequestTimings()
+
+
+def finish_request_timer(response):
+    # Runs after every other after_request hook, so compression is included.
+    # For streamed responses (NDJSON, ZIP) this is the time to the first byte.
+    start = g.get('request_start')
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+    route = request_route()
+    record_request(request.method, route, response.status_code, elapsed)
+
+    timings = g.get('request_timings')
+    if timings is not None:
+        for phase, seconds in timings.phases.items():
+            request_phase_duration.observe(seconds, route, phase)
+        request_upstream_calls.observe(timings.upstream_calls, route)
+        if METRICS_SERVER_TIMING:
+            entries = [f'{phase};dur={seconds * 1000:.1f}' for phase, seconds in timings.phases.items()]
+            entries.append(f'total;dur={elapsed * 1000:.1f}')
+            response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+
+def metrics_view():
+    if METRICS_TOKEN:
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(token, METRICS_TOKEN):
+            return Response('Forbidden\n', status=403, mimetype='text/plain')
+    elif not METRICS_PUBLIC:
+        return Response('Not Found\n', status=404, mimetype='text/plain')
+    if multiprocess_writer is not None:
+        return Response(multiprocess_writer.render(), content_type=PROMETHEUS_MIMETYPE)
+    return Response(registry.render(), content_type=PROMETHEUS_MIMETYPE)
+
+
+def time_json_responses(app):
+    # Wraps the app's JSON provider so sampled requests show serialization time
+    provider_response = app.json.response
+
+    def response(*args, **kwargs):
+        with request_phase('json'):
+            return provider_response(*args, **kwargs)
+
+    app.json.response = response
+
+
+def init_metrics(app):
+    # Call before init_compression so compression counts towards the request time
+    if not METRICS_ENABLED:
+        return
+    app.before_request(start_request_timer)
+    app.after_request(finish_request_timer)
+    time_json_responses(app)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
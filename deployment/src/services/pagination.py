@@ -0,0 +1,95 @@
+import base64
+import json
+from bisect import bisect_right
+from flask import jsonify, request
+from src.services.json_cache import cached_json_response
+
+
+def encode_cursor(values):
+    # Opaque keyset position, the sort key of the last row returned
+    payload = json.dumps(values, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(payload).decode('ascii')
+
+
+def decode_cursor(cursor, size):
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError('Invalid cursor')
+    return values
+
+
+def parse_fields(value, allowed):
+    # fields=id,name,price -> ['id', 'name', 'price'], None when not requested
+    if not value:
+        return None
+    fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def project(row, fields):
+    if fields is None:
+        return row
+    return {field: row[field] for field in fields if field in row}
+
+
+class CodeOrder:
+    # Row positions ordered by code, ties by id, so list endpoints can page
+    # with a [code, id] cursor that survives catalog reloads
+
+    def __init__(self, rows, column):
+        keys = sorted((str(row.get(column) or ''), str(row['id']), position) for position, row in enumerate(rows))
+        self.keys = [[code, row_id] for code, row_id, _ in keys]
+        self.positions = [position for _, _, position in keys]
+
+    def page(self, after=None, limit=None):
+        # Returns (row positions of the page, key of its last row if more follow)
+        start = bisect_right(self.keys, after) if after is not None else 0
+        end = start + limit if limit is not None else len(self.keys)
+        next_key = self.keys[end - 1] if end < len(self.keys) and end > start else None
+        return self.positions[start:end], next_key
+
+
+def parse_limit():
+    # ?limit= shared by the catalog endpoints, 0 is an empty page. ValueError when negative.
+    limit = request.args.get('limit', type=int)
+    if limit is not None and limit < 0:
+        raise ValueError('limit must not be negative')
+    return limit
+
+
+def list_response(key, version, rows, order, allowed_fields):
+    # Shared ?limit=&cursor=&fields= handling for the catalog list endpoints.
+    # Without limit or cursor every row is returned in catalog order. Pages
+    # follow the CodeOrder, X-Next-Cursor is set while more pages follow.
+    try:
+        limit = parse_limit()
+        fields = parse_fields(request.args.get('fields'), allowed_fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    after = None
+    if request.args.get('cursor'):
+        try:
+            after = decode_cursor(request.args['cursor'], 2)
+        except ValueError:
+            after = None
+        if after is None or not all(isinstance(value, str) for value in after):
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    if limit is None and after is None:
+        positions, next_key = range(len(rows)), None
+    else:
+        positions, next_key = order.page(after, limit)
+    response = cached_json_response(
+        (key, tuple(after or ()), limit, tuple(fields or ())), version,
+        lambda: [project(rows[position], fields) for position in positions]
+    )
+    if next_key is not None:
+        response.headers['X-Next-Cursor'] = encode_cursor(next_key)
+    return response
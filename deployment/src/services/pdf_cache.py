@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+# Bump when the quote layout changes so renders cached on disk are not reused
+PDF_TEMPLATE_VERSION = 1
+
+QUOTE_PDF_CACHE_MAX_BYTES = int(os.environ.get('QUOTE_PDF_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+# Optional directory shared by all workers on a host, renders survive restarts
+QUOTE_PDF_CACHE_DIR = os.environ.get('QUOTE_PDF_CACHE_DIR')
+QUOTE_PDF_CACHE_DIR_MAX_BYTES = int(os.environ.get('QUOTE_PDF_CACHE_DIR_MAX_BYTES', str(512 * 1024 * 1024)))
+# Keys carry the render date, files from an earlier day are never read again
+QUOTE_PDF_CACHE_MAX_AGE = float(os.environ.get('QUOTE_PDF_CACHE_MAX_AGE', '86400'))
+QUOTE_PDF_CACHE_MAX_QUOTES = int(os.environ.get('QUOTE_PDF_CACHE_MAX_QUOTES', '10000'))
+# Seconds between sweeps of the disk tier, sooner when this process wrote a lot
+QUOTE_PDF_CACHE_SWEEP_INTERVAL = 60
+
+
+def quote_pdf_cache_key(quote, session, chassis, body):
+    # The PDF prints the render date, so a new day means a new document
+    payload = json.dumps(
+        [PDF_TEMPLATE_VERSION, date.today().isoformat(), quote, session, chassis, body],
+        sort_keys=True,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class PdfCache:
+    # Bounded LRU of rendered PDFs by content hash, with an optional disk tier.
+    # Only the newest render of each quote is kept, an older one is dropped as
+    # soon as the quote data behind it changes. The disk tier is swept by age
+    # and total size, oldest files first, and the quote -> key map is an LRU
+    # too, a quote that falls out of it just keeps its render until evicted.
+
+    def __init__(self, max_bytes=QUOTE_PDF_CACHE_MAX_BYTES, directory=QUOTE_PDF_CACHE_DIR,
+                 directory_max_bytes=QUOTE_PDF_CACHE_DIR_MAX_BYTES, max_age=QUOTE_PDF_CACHE_MAX_AGE,
+                 max_quotes=QUOTE_PDF_CACHE_MAX_QUOTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.directory_max_bytes = directory_max_bytes
+        self.max_age = max_age
+        self.max_quotes = max_quotes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._keys_by_quote = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+        self._written = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                return data
+
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                if time.time() - os.fstat(f.fileno()).st_mtime > self.max_age:
+                    return None
+                data = f.read()
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            self._store(key, data)
+        return data
+
+    def put(self, quote_id, key, data):
+        with self._lock:
+            previous = self._keys_by_quote.get(quote_id)
+            if previous is not None and previous != key:
+                self._discard(previous)
+            self._keys_by_quote[quote_id] = key
+            self._keys_by_quote.move_to_end(quote_id)
+            while len(self._keys_by_quote) > self.max_quotes:
+                self._keys_by_quote.popitem(last=False)
+            self._store(key, data)
+
+        if self.directory:
+            # Write then rename so other workers never read a partial file
+            path = self._path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            self._maybe_sweep(len(data))
+
+    def invalidate(self, quote_id):
+        with self._lock:
+            key = self._keys_by_quote.pop(quote_id, None)
+            if key is not None:
+                self._discard(key)
+
+    def _store(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._size -= len(self._entries.pop(key))
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _discard(self, key):
+        data = self._entries.pop(key, None)
+        if data is not None:
+            self._size -= len(data)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def _maybe_sweep(self, written):
+        with self._lock:
+            self._written += written
+            now = time.monotonic()
+            if now < self._next_sweep and self._written < self.directory_max_bytes // 10:
+                return
+            self._next_sweep = now + QUOTE_PDF_CACHE_SWEEP_INTERVAL
+            self._written = 0
+        self.sweep()
+
+    def sweep(self):
+        # Other workers may sweep the same directory, a file can vanish under us
+        files = []
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith('.pdf'):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        cutoff = time.time() - self.max_age
+        for mtime, size, path in files:
+            if mtime >= cutoff and total <= self.directory_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pdf")
+
+
+pdf_cache = PdfCache()
@@ -0,0 +1,330 @@
+# Render jobs are tracked by the worker that submitted them. With
+# QUOTE_PDF_CACHE_DIR set, every job is also written to its jobs/ directory,
+# so a status poll answered by another worker on the host still finds it
+# (as queued until the owner records the result). Without that directory
+# job status is per worker, use it with a single worker only.
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from src.services.quote_pdf import load_quote_template, render_quote_pdf, warm_worker
+from src.services.pdf_cache import pdf_cache, quote_pdf_cache_key, QUOTE_PDF_CACHE_DIR
+from src.services.metrics import record_pdf_render, request_phase
+from src.services.profiling import profiling_request, add_worker_samples, sample_call
+from src.services.workers import configured_workers
+
+# ReportLab is pure Python, rendering in worker processes keeps the GIL free
+# for the request threads. 0 renders inline in the calling thread.
+PDF_RENDER_WORKERS = int(os.environ.get('PDF_RENDER_WORKERS', '2'))
+# Seconds a finished job stays visible to the status endpoint
+PDF_JOB_RETENTION = float(os.environ.get('PDF_JOB_RETENTION', '3600'))
+# Render the PDF as soon as a quote is created
+QUOTE_PDF_PRERENDER = os.environ.get('QUOTE_PDF_PRERENDER', 'false').lower() == 'true'
+# Seconds between removals of expired job files
+PDF_JOB_SWEEP_INTERVAL = 60
+
+if not QUOTE_PDF_CACHE_DIR and configured_workers() != 1:
+    print("WARNING: PDF render job status is kept per worker, polls may not find a job "
+          "submitted to another worker. Set QUOTE_PDF_CACHE_DIR to share it")
+
+
+def timed_render(fn, *args, profile=False):
+    # Runs in the worker. Reports when the render started and how long it took,
+    # so time spent waiting for a worker is recorded apart from the render.
+    # With profile, also the worker's stack samples for the profiled request.
+    started = time.time()
+    start = time.perf_counter()
+    samples = None
+    if profile:
+        result, samples = sample_call(fn, *args)
+    else:
+        result = fn(*args)
+    return result, started, time.perf_counter() - start, samples
+
+
+def render_result(future):
+    return future.result()[0]
+
+
+def profiled_result(future):
+    # render_result() for the request waiting on the render, adding the
+    # worker's stacks to its profile when it is being profiled
+    result, started, seconds, samples = future.result()
+    add_worker_samples(samples)
+    return result
+
+
+class PdfRenderJob:
+
+    def __init__(self, quote_id, cache_key, future=None, job_id=None):
+        self.id = job_id or str(uuid.uuid4())
+        self.quote_id = quote_id
+        self.cache_key = cache_key
+        self.future = future
+        self.created_at = time.time()
+        self.finished_at = None if future else self.created_at
+        self.error = None
+
+    @classmethod
+    def from_record(cls, record):
+        # A job submitted by another worker, as it last wrote it
+        job = cls(record['quoteId'], record['cacheKey'], job_id=record['id'])
+        job.created_at = record['createdAt']
+        job.finished_at = record['finishedAt']
+        job.error = record['error']
+        return job
+
+    @property
+    def status(self):
+        if self.finished_at is not None:
+            return 'failed' if self.error else 'done'
+        if self.future is None:
+            return 'queued'
+        return 'running' if self.future.running() else 'queued'
+
+    def to_record(self):
+        return {
+            'id': self.id,
+            'quoteId': self.quote_id,
+            'cacheKey': self.cache_key,
+            'createdAt': self.created_at,
+            'finishedAt': self.finished_at,
+            'error': self.error
+        }
+
+    def to_dict(self):
+        return {
+            'jobId': self.id,
+            'quoteId': self.quote_id,
+            'status': self.status,
+            'error': self.error,
+            'createdAt': datetime.fromtimestamp(self.created_at).isoformat(),
+            'finishedAt': datetime.fromtimestamp(self.finished_at).isoformat() if self.finished_at else None,
+            'pdfUrl': f"/api/quotes/{self.quote_id}/pdf"
+        }
+
+
+class PdfRenderQueue:
+    # Jobs are keyed by the PDF cache key, so submitting the same quote data
+    # twice joins the render already in flight instead of starting another.
+
+    def __init__(self, workers=PDF_RENDER_WORKERS, jobs_dir=None):
+        self.workers = workers
+        if jobs_dir is None and QUOTE_PDF_CACHE_DIR:
+            jobs_dir = os.path.join(QUOTE_PDF_CACHE_DIR, 'jobs')
+        self.jobs_dir = jobs_dir
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._jobs = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0
+        if jobs_dir:
+            os.makedirs(jobs_dir, exist_ok=True)
+
+    def submit(self, quote_id, bundle):
+        quote, session, chassis, body = bundle
+        cache_key = quote_pdf_cache_key(quote, session, chassis, body)
+
+        with self._lock:
+            self._prune()
+            job = self._pending.get(cache_key)
+            if job is not None:
+                return job
+
+            if pdf_cache.get(cache_key) is not None:
+                job = PdfRenderJob(quote_id, cache_key)
+            else:
+                future = self._submit(render_quote_pdf, quote, chassis, body)
+                job = PdfRenderJob(quote_id, cache_key, future)
+                self._pending[cache_key] = job
+            self._jobs[job.id] = job
+
+        self._save(job)
+        if job.future is not None:
+            job.future.add_done_callback(lambda future: self._finish(job))
+        return job
+
+    def render(self, quote_id, bundle):
+        # Blocking render used by the download endpoint
+        with request_phase('pdf'):
+            if self.workers <= 0:
+                quote, session, chassis, body = bundle
+                pdf_data = self._render_inline(render_quote_pdf, quote, chassis, body)
+                pdf_cache.put(quote_id, quote_pdf_cache_key(quote, session, chassis, body), pdf_data)
+                return pdf_data
+
+            job = self.submit(quote_id, bundle)
+            if job.future is not None:
+                return profiled_result(job.future)
+            return self._cached(job, bundle)
+
+    def render_many(self, bundles):
+        # Yields (quote, pdf_data) as each render finishes, cached ones first
+        if self.workers <= 0:
+            for bundle in bundles:
+                yield bundle[0], self.render(bundle[0]['id'], bundle)
+            return
+
+        pending = {}
+        for bundle in bundles:
+            quote = bundle[0]
+            job = self.submit(quote['id'], bundle)
+            if job.future is None:
+                yield quote, self._cached(job, bundle)
+            else:
+                pending[job.future] = quote
+
+        for future in as_completed(pending):
+            yield pending[future], render_result(future)
+
+    def run(self, fn, *args):
+        # Runs any picklable render function in the pool and waits for it
+        with request_phase('pdf'):
+            if self.workers <= 0:
+                return self._render_inline(fn, *args)
+            return profiled_result(self._submit(fn, *args))
+
+    def warm_up(self):
+        # Starts the worker processes and has each import ReportLab
+        if self.workers <= 0:
+            load_quote_template()
+            return
+        futures = [self._pool_submit(warm_worker) for _ in range(self.workers)]
+        for future in futures:
+            future.result()
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is not None or not self.jobs_dir:
+            return job
+        try:
+            with open(self._job_path(str(uuid.UUID(job_id)))) as f:
+                record = json.load(f)
+        except (ValueError, FileNotFoundError):
+            return None
+        job = PdfRenderJob.from_record(record)
+        if job.finished_at is not None and job.finished_at < time.time() - PDF_JOB_RETENTION:
+            return None
+        return job
+
+    def _cached(self, job, bundle):
+        pdf_data = pdf_cache.get(job.cache_key)
+        if pdf_data is None:
+            # Evicted between the lookup in submit() and now
+            quote, session, chassis, body = bundle
+            pdf_data = self._render_inline(render_quote_pdf, quote, chassis, body)
+        return pdf_data
+
+    def _finish(self, job):
+        try:
+            pdf_cache.put(job.quote_id, job.cache_key, render_result(job.future))
+        except Exception as e:
+            print(f"PDF render job error: {e}")
+            job.error = 'Failed to generate PDF'
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._pending.pop(job.cache_key, None)
+            self._save(job)
+
+    def _save(self, job):
+        if not self.jobs_dir:
+            return
+        try:
+            path = self._job_path(job.id)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(job.to_record(), f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"PDF render job write error: {e}")
+
+    def _job_path(self, job_id):
+        return os.path.join(self.jobs_dir, f"{job_id}.json")
+
+    def _submit(self, fn, *args):
+        submitted = time.time()
+        future = self._pool_submit(timed_render, fn, *args, profile=profiling_request())
+        future.add_done_callback(lambda future: self._record(fn.__name__, submitted, future))
+        return future
+
+    def _pool_submit(self, fn, *args, **kwargs):
+        # A worker that died (crash, OOM kill) breaks the whole pool, every
+        # later submit would fail. Replace it and submit once more.
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            self._replace_executor(executor)
+            executor = self._get_executor()
+            future = executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(lambda future: self._check_pool(executor, future))
+        return future
+
+    def _check_pool(self, executor, future):
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._replace_executor(executor)
+
+    def _render_inline(self, fn, *args):
+        result, started, seconds, samples = timed_render(fn, *args)
+        record_pdf_render(fn.__name__, None, started, seconds)
+        return result
+
+    def _record(self, kind, submitted, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        result, started, seconds, samples = future.result()
+        record_pdf_render(kind, submitted, started, seconds)
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # Spawned workers only import ReportLab, never the app's threads or sockets
+                self._executor = ProcessPoolExecutor(
+                    max_workers=max(self.workers, 1),
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def shutdown(self):
+        # Waits for renders already running, their workers exit with them
+        with self._executor_lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _replace_executor(self, executor):
+        with self._executor_lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        print("PDF render worker died, starting a new pool")
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _prune(self):
+        cutoff = time.time() - PDF_JOB_RETENTION
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+        if not self.jobs_dir or time.monotonic() < self._next_sweep:
+            return
+        self._next_sweep = time.monotonic() + PDF_JOB_SWEEP_INTERVAL
+        # Unfinished jobs are kept as long, a worker may have died with them
+        for entry in os.scandir(self.jobs_dir):
+            try:
+                if entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+
+pdf_render_queue = PdfRenderQueue()
@@ -0,0 +1,181 @@
+import math
+import os
+import threading
+from collections import OrderedDict
+from src.services.catalog_cache import catalog_cache
+
+# Column of body_configurations holding a list price; unset means every body
+# is "Contact for pricing" and adds nothing to the estimate
+BODY_PRICE_COLUMN = os.environ.get('BODY_PRICE_COLUMN')
+# Memoized (chassis, body, options) estimates kept per catalog version
+PRICING_MEMO_SIZE = int(os.environ.get('PRICING_MEMO_SIZE', '4096'))
+
+
+class ContactForPricing:
+
+    def price(self, body):
+        return 0, 'Contact for pricing'
+
+
+class ColumnBodyPricing:
+
+    def __init__(self, column):
+        self.column = column
+
+    def price(self, body):
+        if body.get(self.column) is None:
+            return 0, 'Contact for pricing'
+        return float(body[self.column]), None
+
+
+class PriceTable:
+    # Base price of every chassis/body combination for one catalog version
+
+    def __init__(self, snapshot, body_pricing):
+        self.version = snapshot.version
+        self.chassis = {
+            chassis_id: chassis_prices(row) for chassis_id, row in snapshot.chassis_rows_by_id.items()
+        }
+        self.bodies = {
+            body_id: body_pricing.price(row) for body_id, row in snapshot.body_rows_by_id.items()
+        }
+        self.combinations = {}
+        for chassis_id, (msrp, destination_charge) in self.chassis.items():
+            self.combinations[(chassis_id, None)] = msrp + destination_charge
+            for body_id, (body_price, _) in self.bodies.items():
+                self.combinations[(chassis_id, body_id)] = msrp + destination_charge + body_price
+
+
+class PricingEngine:
+
+    def __init__(self, body_pricing=None, memo_size=PRICING_MEMO_SIZE):
+        self.body_pricing = body_pricing or create_body_pricing(BODY_PRICE_COLUMN)
+        self.memo_size = memo_size
+        self._table = None
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    def table(self):
+        snapshot = catalog_cache.get()
+        table = self._table
+        if table is None or table.version != snapshot.version:
+            table = PriceTable(snapshot, self.body_pricing)
+            with self._lock:
+                self._table = table
+                self._memo.clear()
+        return table
+
+    def estimate(self, chassis_id, body_id=None, options=()):
+        # Raises KeyError for a chassis or body that is not in the catalog
+        table = self.table()
+        chassis_id = str(chassis_id)
+        body_id = str(body_id) if body_id else None
+        options_key = tuple(sorted(options_key_items(options)))
+        key = (table.version, chassis_id, body_id, options_key)
+
+        with self._lock:
+            estimate = self._memo.get(key)
+            if estimate is not None:
+                self._memo.move_to_end(key)
+                return estimate
+
+        if chassis_id not in table.chassis:
+            raise KeyError('Chassis not found')
+        if body_id and body_id not in table.bodies:
+            raise KeyError('Body configuration not found')
+
+        msrp, destination_charge = table.chassis[chassis_id]
+        body_price, body_note = table.bodies[body_id] if body_id else (0, None)
+        options_price = sum(unit_price * quantity for _, unit_price, quantity in options_key)
+        estimate = build_estimate(
+            msrp, destination_charge, body_price, body_note, options_price,
+            table.combinations[(chassis_id, body_id)] + options_price
+        )
+
+        with self._lock:
+            self._memo[key] = estimate
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return estimate
+
+    def price_selection(self, chassis, body):
+        # Prices a session's selected rows. Rows that are newer than the
+        # catalog snapshot are priced directly instead of from the table.
+        if chassis:
+            try:
+                return self.estimate(chassis['id'], body['id'] if body else None)
+            except KeyError:
+                pass
+
+        msrp, destination_charge = chassis_prices(chassis) if chassis else (0, 0)
+        body_price, body_note = self.body_pricing.price(body) if body else (0, None)
+        return build_estimate(
+            msrp, destination_charge, body_price, body_note, 0,
+            msrp + destination_charge + body_price
+        )
+
+
+def chassis_prices(chassis):
+    return float(chassis.get('msrp') or 0), float(chassis.get('destination_charge') or 0)
+
+
+def options_key_items(options):
+    # ValueError names the option and field that can't be priced
+    for position, option in enumerate(options or ()):
+        if not isinstance(option, dict):
+            raise ValueError(f'options[{position}] must be an object')
+        yield (
+            str(option.get('code') or option.get('id') or ''),
+            non_negative_amount(option.get('unitPrice') or 0, f'options[{position}].unitPrice'),
+            whole_quantity(option.get('quantity', 1), f'options[{position}].quantity')
+        )
+
+
+def non_negative_amount(value, name):
+    if isinstance(value, bool):
+        raise ValueError(f'{name} must be a number')
+    try:
+        number = float(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f'{name} must be a number')
+    if not math.isfinite(number):
+        raise ValueError(f'{name} must be a number')
+    if number < 0:
+        raise ValueError(f'{name} must not be negative')
+    return number
+
+
+def whole_quantity(value, name):
+    number = non_negative_amount(value, name)
+    if not number.is_integer():
+        raise ValueError(f'{name} must be a whole number')
+    return int(number)
+
+
+def build_estimate(msrp, destination_charge, body_price, body_note, options_price, total_price):
+    return {
+        'chassisPrice': msrp,
+        'bodyPrice': body_price,
+        'optionsPrice': options_price,
+        'destinationCharge': destination_charge,
+        'totalPrice': total_price,
+        'breakdown': {
+            'chassis': {
+                'msrp': msrp,
+                'destinationCharge': destination_charge
+            },
+            'body': {
+                'price': body_price,
+                'note': body_note
+            }
+        }
+    }
+
+
+def create_body_pricing(column):
+    if column:
+        return ColumnBodyPricing(column)
+    return ContactForPricing()
+
+
+pricing_engine = PricingEngine()
@@ -0,0 +1,294 @@
+# Opt-in sampling profiler for single requests.
+#
+# A sampler thread walks the stacks of the threads serving profiled requests
+# and writes one folded-stack capture per request to PROFILE_DIR/<route>/.
+# Quote PDFs render in a process pool (PDF_RENDER_WORKERS > 0), where the
+# request thread only waits on future.result(). For a profiled request the
+# pool task runs this sampler inside the worker too, and its stacks are added
+# to the request's capture under a "[pdf worker]" root frame. Renders joined
+# from another request's job, and those started for a ZIP export whose stream
+# outlives the request, are not sampled. PDF_RENDER_WORKERS=0 renders in the
+# request thread instead, which shows the whole render as one stack.
+import argparse
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from flask import g, has_request_context, request
+
+# Opt-in. Each trigger below also needs PROFILE_ENABLED=true.
+PROFILE_ENABLED = os.environ.get('PROFILE_ENABLED', 'false').lower() == 'true'
+# Requests sent with X-Profile: <token> are always captured
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+# Share of requests captured at random
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+# Every request is sampled, only those slower than this many ms are kept. 0 turns it off.
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', '0'))
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', '/tmp/endera-profiles')
+# Oldest captures of a route are deleted beyond this
+PROFILE_MAX_CAPTURES = int(os.environ.get('PROFILE_MAX_CAPTURES', '200'))
+
+CAPTURE_SUFFIX = '.folded'
+# Root frame of the stacks sampled in a PDF worker process
+WORKER_ROOT = '[pdf worker]'
+
+_frame_labels = {}
+
+
+def frame_label(code):
+    label = _frame_labels.get(code)
+    if label is None:
+        path = code.co_filename
+        for marker in ('site-packages' + os.sep, 'deployment' + os.sep):
+            if marker in path:
+                path = path.split(marker, 1)[1]
+                break
+        label = _frame_labels[code] = f"{code.co_name} ({path}:{code.co_firstlineno})".replace(';', ',')
+    return label
+
+
+def collapse(frame):
+    # Root first, in the folded format flamegraph.pl and speedscope read
+    stack = []
+    while frame is not None:
+        stack.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(stack))
+
+
+class StackSampler:
+    # One thread per process that walks the stacks of the request threads
+    # being profiled every interval. Profiled requests pay nothing on their
+    # own thread, and the sampler sleeps while nothing is being profiled.
+
+    def __init__(self, interval=PROFILE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self, thread_id):
+        with self._lock:
+            self._active[thread_id] = {}
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, None)
+
+    def merge(self, thread_id, counts, root):
+        # Adds stacks sampled elsewhere (a worker process) to a thread's profile
+        with self._lock:
+            active = self._active.get(thread_id)
+            if active is None:
+                return
+            for stack, count in counts.items():
+                key = f'{root};{stack}'
+                active[key] = active.get(key, 0) + count
+
+    def _run(self):
+        while True:
+            with self._lock:
+                thread_ids = list(self._active)
+                if not thread_ids:
+                    self._wake.clear()
+            if not thread_ids:
+                self._wake.wait()
+                continue
+
+            frames = sys._current_frames()
+            for thread_id in thread_ids:
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = collapse(frame)
+                with self._lock:
+                    counts = self._active.get(thread_id)
+                    if counts is not None:
+                        counts[stack] = counts.get(stack, 0) + 1
+            del frames
+            time.sleep(self.interval)
+
+
+sampler = StackSampler()
+
+
+def route_slug(method, rule):
+    return re.sub(r'[^A-Za-z0-9]+', '_', f'{method} {rule}').strip('_')
+
+
+def write_capture(directory, slug, counts, elapsed_ms, trigger):
+    route_dir = os.path.join(directory, slug)
+    os.makedirs(route_dir, exist_ok=True)
+    name = f"{datetime.now():%Y%m%d-%H%M%S-%f}-{elapsed_ms:.0f}ms-{trigger}{CAPTURE_SUFFIX}"
+    with open(os.path.join(route_dir, name), 'w') as f:
+        for stack, count in sorted(counts.items()):
+            f.write(f'{stack} {count}\n')
+
+    captures = sorted(entry for entry in os.listdir(route_dir) if entry.endswith(CAPTURE_SUFFIX))
+    for old in captures[:-PROFILE_MAX_CAPTURES]:
+        try:
+            os.remove(os.path.join(route_dir, old))
+        except OSError:
+            pass
+    return os.path.join(slug, name)
+
+
+def profile_trigger():
+    if PROFILE_TOKEN and hmac.compare_digest(request.headers.get('X-Profile', ''), PROFILE_TOKEN):
+        return 'header'
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE:
+        return 'sample'
+    if PROFILE_SLOW_MS:
+        return 'slow'
+    return None
+
+
+def start_profile():
+    trigger = profile_trigger()
+    if trigger is None:
+        return
+    g.profile = (trigger, threading.get_ident(), time.perf_counter())
+    sampler.start(g.profile[1])
+
+
+def finish_profile(response):
+    # For streamed responses (NDJSON, ZIP) this covers the view, not the stream
+    profile = g.pop('profile', None)
+    if profile is None:
+        return response
+    trigger, thread_id, start = profile
+    counts = sampler.stop(thread_id)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not counts or (trigger == 'slow' and elapsed_ms < PROFILE_SLOW_MS):
+        return response
+
+    rule = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    try:
+        capture = write_capture(PROFILE_DIR, route_slug(request.method, rule), counts, elapsed_ms, trigger)
+    except OSError as e:
+        print(f"Profile capture error: {e}")
+        return response
+    if trigger == 'header':
+        response.headers['X-Profile-Capture'] = capture
+    return response
+
+
+def profiling_request():
+    # True inside a request whose stacks are being sampled
+    return has_request_context() and g.get('profile') is not None
+
+
+def add_worker_samples(counts):
+    # Stacks a PDF worker sampled for this request, see sample_call()
+    if counts and profiling_request():
+        sampler.merge(g.profile[1], counts, WORKER_ROOT)
+
+
+def sample_call(fn, *args):
+    # Runs fn in this (worker) process with its stacks sampled.
+    # Returns (result, {stack: samples}).
+    thread_id = threading.get_ident()
+    sampler.start(thread_id)
+    try:
+        result = fn(*args)
+    finally:
+        counts = sampler.stop(thread_id)
+    return result, counts or {}
+
+
+def discard_profile(exc):
+    # after_request is skipped when a view raises, don't leave the thread sampled
+    profile = g.pop('profile', None)
+    if profile is not None:
+        sampler.stop(profile[1])
+
+
+def init_profiling(app):
+    if not PROFILE_ENABLED:
+        return
+    app.before_request(start_profile)
+    app.after_request(finish_profile)
+    app.teardown_request(discard_profile)
+
+
+def read_captures(directory, route=None):
+    # Yields (route slug, {stack: samples}) for every capture file
+    if not os.path.isdir(directory):
+        return
+    for slug in sorted(os.listdir(directory)):
+        route_dir = os.path.join(directory, slug)
+        if not os.path.isdir(route_dir) or (route and route not in slug):
+            continue
+        for name in sorted(os.listdir(route_dir)):
+            if not name.endswith(CAPTURE_SUFFIX):
+                continue
+            counts = {}
+            with open(os.path.join(route_dir, name)) as f:
+                for line in f:
+                    stack, _, count = line.rstrip('\n').rpartition(' ')
+                    if stack:
+                        counts[stack] = counts.get(stack, 0) + int(count)
+            yield slug, counts
+
+
+def hot_functions(captures):
+    # Samples per function: self (leaf of the stack) and total (anywhere on it)
+    own = {}
+    total = {}
+    samples = 0
+    for slug, counts in captures:
+        for stack, count in counts.items():
+            frames = stack.split(';')
+            samples += count
+            own[frames[-1]] = own.get(frames[-1], 0) + count
+            for frame in set(frames):
+                total[frame] = total.get(frame, 0) + count
+    return samples, own, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Hot functions across profile captures')
+    parser.add_argument('--dir', default=PROFILE_DIR)
+    parser.add_argument('--route', help='only captures whose route contains this, e.g. quotes_quote_id_pdf')
+    parser.add_argument('--top', type=int, default=20)
+    parser.add_argument('--sort', choices=['self', 'total'], default='self')
+    parser.add_argument('--folded', help='also write every capture merged into one folded file for a flame graph')
+    args = parser.parse_args()
+
+    captures = list(read_captures(args.dir, args.route))
+    if not captures:
+        sys.exit(f'No captures in {args.dir}')
+
+    samples, own, total = hot_functions(captures)
+    routes = sorted({slug for slug, counts in captures})
+    print(f"{len(captures)} captures, {samples} samples, routes: {', '.join(routes)}")
+    print(f"{'self %':>7} {'total %':>8}  function")
+    ranking = own if args.sort == 'self' else total
+    for frame, count in sorted(ranking.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{own.get(frame, 0) / samples * 100:>7.1f} {total[frame] / samples * 100:>8.1f}  {frame}")
+
+    if args.folded:
+        merged = {}
+        for slug, counts in captures:
+            for stack, count in counts.items():
+                # The route becomes the root frame, so one flame graph covers every route
+                key = f'{slug};{stack}'
+                merged[key] = merged.get(key, 0) + count
+        with open(args.folded, 'w') as f:
+            for stack, count in sorted(merged.items()):
+                f.write(f'{stack} {count}\n')
+        print(f"\nmerged stacks written to {args.folded}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+from concurrent.futures import ThreadPoolExecutor
+from src.services.supabase_client import supabase, api_error
+from src.services.catalog_cache import catalog_cache
+from src.services.selection_buffer import flush_session_selections
+from src.services.session_store import session_store
+
+# Session with its selected chassis and body, resolved by PostgREST in one request
+SESSION_SELECT = (
+    '*, '
+    'chassis:chassis!selected_chassis_id(*), '
+    'body:body_configurations!selected_body_id(*)'
+)
+QUOTE_SELECT = f'*, session:configuration_sessions!session_id({SESSION_SELECT})'
+
+# PostgREST codes for a missing or ambiguous relationship between two tables
+EMBEDDING_ERRORS = {'PGRST200', 'PGRST201'}
+
+lookup_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='bundle-lookup')
+
+# Flipped off the first time the schema turns out not to expose the foreign keys
+embedding_enabled = True
+
+
+def load_session_bundle(session_id):
+    # Returns (session, chassis, body) or None when the session does not exist
+    global embedding_enabled
+    flush_session_selections(session_id)
+    
+    if embedding_enabled and not session_store.enabled:
+        try:
+            response = supabase.table('configuration_sessions').select(SESSION_SELECT).eq('id', session_id).execute()
+            if not response.data:
+                return None
+            return split_session(response.data[0])
+        except api_error() as e:
+            if e.code not in EMBEDDING_ERRORS:
+                raise
+            print(f"Session embedding unavailable, using separate lookups: {e.message}")
+            embedding_enabled = False
+
+    # With a warm session store and catalog snapshot this needs no round trip
+    session = session_store.get(session_id)
+    if session is None:
+        return None
+    chassis, body = load_selected_items(session)
+    return session, chassis, body
+
+
+def load_quote_bundle(quote_id):
+    # Returns (quote, session, chassis, body) or None when the quote does not exist
+    global embedding_enabled
+    if embedding_enabled:
+        try:
+            response = supabase.table('quotes').select(QUOTE_SELECT).eq('id', quote_id).execute()
+            if not response.data:
+                return None
+            quote = dict(response.data[0])
+            session, chassis, body = split_session(quote.pop('session', None) or {})
+            return quote, session, chassis, body
+        except api_error() as e:
+            if e.code not in EMBEDDING_ERRORS:
+                raise
+            print(f"Quote embedding unavailable, using separate lookups: {e.message}")
+            embedding_enabled = False
+
+    response = supabase.table('quotes').select('*').eq('id', quote_id).execute()
+    if not response.data:
+        return None
+    quote = response.data[0]
+
+    session = {}
+    if quote.get('session_id'):
+        session = session_store.get(quote['session_id']) or {}
+
+    chassis, body = load_selected_items(session)
+    return quote, session, chassis, body
+
+
+def split_session(row):
+    session = dict(row)
+    chassis = session.pop('chassis', None) or {}
+    body = session.pop('body', None) or {}
+    return session, chassis, body
+
+
+def load_selected_items(session):
+    # Chassis and body rows come from the catalog snapshot when possible,
+    # anything missing from it is fetched concurrently
+    chassis_id = session.get('selected_chassis_id')
+    body_id = session.get('selected_body_id')
+
+    snapshot = catalog_cache.get()
+    chassis = snapshot.chassis_rows_by_id.get(str(chassis_id), {}) if chassis_id else {}
+    body = snapshot.body_rows_by_id.get(str(body_id), {}) if body_id else {}
+
+    chassis_future = None
+    body_future = None
+    if chassis_id and not chassis:
+        chassis_future = lookup_pool.submit(fetch_row, 'chassis', chassis_id)
+    if body_id and not body:
+        body_future = lookup_pool.submit(fetch_row, 'body_configurations', body_id)
+
+    if chassis_future:
+        chassis = chassis_future.result()
+    if body_future:
+        body = body_future.result()
+    return chassis, body
+
+
+def fetch_row(table, row_id):
+    response = supabase.table(table).select('*').eq('id', row_id).execute()
+    return response.data[0] if response.data else {}
+
+
+# Keeps in.(...) filters well inside URL length limits
+IN_FILTER_CHUNK_SIZE = 100
+
+
+def load_quote_bundles(quote_ids=None, created_from=None, created_before=None, limit=None):
+    # Batched load_quote_bundle for exports, either by id list (kept in the
+    # requested order) or by created_at range (oldest first)
+    global embedding_enabled
+    if embedding_enabled:
+        try:
+            bundles = []
+            for quote in select_quotes(QUOTE_SELECT, quote_ids, created_from, created_before, limit):
+                quote = dict(quote)
+                session, chassis, body = split_session(quote.pop('session', None) or {})
+                bundles.append((quote, session, chassis, body))
+            return bundles
+        except api_error() as e:
+            if e.code not in EMBEDDING_ERRORS:
+                raise
+            print(f"Quote embedding unavailable, using separate lookups: {e.message}")
+            embedding_enabled = False
+
+    quotes = select_quotes('*', quote_ids, created_from, created_before, limit)
+    session_ids = {quote['session_id'] for quote in quotes if quote.get('session_id')}
+    sessions = {str(session['id']): session for session in fetch_rows('configuration_sessions', session_ids)}
+
+    snapshot = catalog_cache.get()
+    chassis_rows = dict(snapshot.chassis_rows_by_id)
+    body_rows = dict(snapshot.body_rows_by_id)
+
+    # Anything the snapshot does not know yet is fetched in two batched queries
+    missing_chassis = {str(session['selected_chassis_id']) for session in sessions.values()
+                       if session.get('selected_chassis_id') and str(session['selected_chassis_id']) not in chassis_rows}
+    missing_bodies = {str(session['selected_body_id']) for session in sessions.values()
+                      if session.get('selected_body_id') and str(session['selected_body_id']) not in body_rows}
+    chassis_future = lookup_pool.submit(fetch_rows, 'chassis', missing_chassis)
+    body_future = lookup_pool.submit(fetch_rows, 'body_configurations', missing_bodies)
+    chassis_rows.update({str(row['id']): row for row in chassis_future.result()})
+    body_rows.update({str(row['id']): row for row in body_future.result()})
+
+    bundles = []
+    for quote in quotes:
+        session = sessions.get(str(quote.get('session_id')), {})
+        chassis = chassis_rows.get(str(session.get('selected_chassis_id')), {})
+        body = body_rows.get(str(session.get('selected_body_id')), {})
+        bundles.append((quote, session, chassis, body))
+    return bundles
+
+
+def select_quotes(columns, quote_ids, created_from, created_before, limit):
+    if quote_ids is not None:
+        chunks = [quote_ids[i:i + IN_FILTER_CHUNK_SIZE] for i in range(0, len(quote_ids), IN_FILTER_CHUNK_SIZE)]
+        responses = lookup_pool.map(
+            lambda chunk: supabase.table('quotes').select(columns).in_('id', chunk).execute().data,
+            chunks
+        )
+        by_id = {str(row['id']): row for rows in responses for row in rows}
+        return [by_id[str(quote_id)] for quote_id in quote_ids if str(quote_id) in by_id]
+
+    query = supabase.table('quotes').select(columns)
+    if created_from:
+        query = query.gte('created_at', created_from)
+    if created_before:
+        query = query.lt('created_at', created_before)
+    query = query.order('created_at')
+    if limit is not None:
+        query = query.limit(limit)
+    return query.execute().data
+
+
+def fetch_rows(table, row_ids):
+    row_ids = list(row_ids)
+    if not row_ids:
+        return []
+    chunks = [row_ids[i:i + IN_FILTER_CHUNK_SIZE] for i in range(0, len(row_ids), IN_FILTER_CHUNK_SIZE)]
+    rows = []
+    for chunk in chunks:
+        rows.extend(supabase.table(table).select('*').in_('id', chunk).execute().data)
+    return rows
@@ -0,0 +1,46 @@
+import os
+import uuid
+from datetime import datetime
+from src.services.supabase_client import supabase
+
+# Rows fetched per Supabase round trip while streaming a listing
+QUOTE_LIST_PAGE_SIZE = int(os.environ.get('QUOTE_LIST_PAGE_SIZE', '500'))
+
+
+def quote_cursor(values):
+    # [created_at, id] from a client cursor, re-serialized so nothing but a
+    # timestamp and a UUID reaches the PostgREST filter. ValueError otherwise.
+    created_at, quote_id = values
+    try:
+        return datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(quote_id))
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError('Invalid cursor')
+
+
+def select_quote_page(after=None, limit=QUOTE_LIST_PAGE_SIZE, status=None):
+    # Newest first, ties on created_at broken by id so pages never overlap
+    query = supabase.table('quotes').select('*')
+    if status:
+        query = query.eq('quote_status', status)
+    if after:
+        created_at, quote_id = quote_cursor(after)
+        query = query.or_(
+            f'created_at.lt."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.lt."{quote_id}")'
+        )
+    return query.order('created_at', desc=True).order('id', desc=True).limit(limit).execute().data
+
+
+def iter_quotes(after=None, status=None, limit=None, page_size=QUOTE_LIST_PAGE_SIZE):
+    # Yields quotes page by page, only one page is held in memory at a time
+    remaining = limit
+    while remaining is None or remaining > 0:
+        size = page_size if remaining is None else min(page_size, remaining)
+        rows = select_quote_page(after, size, status)
+        for row in rows:
+            yield row
+        if len(rows) < size:
+            return
+        after = (rows[-1]['created_at'], str(rows[-1]['id']))
+        if remaining is not None:
+            remaining -= len(rows)
@@ -0,0 +1,130 @@
+import io
+from datetime import datetime
+
+
+def pdf_filename(quote):
+    return f"Endera_Quote_{quote.get('quote_number', 'quote')}.pdf"
+
+
+def load_quote_template():
+    # ReportLab is imported with the template on the first render, not at startup
+    from src.services.quote_template import quote_template
+    return quote_template
+
+
+def warm_worker():
+    # Submitted to each PDF worker by the warm-up endpoint
+    load_quote_template()
+    return True
+
+
+def build_quote_elements(quote, chassis_data, body_data, template=None):
+    from reportlab.platypus import Spacer
+    template = template or load_quote_template()
+    
+    # Container for the 'Flowable' objects
+    elements = template.header()
+    
+    # Quote info
+    quote_info = [
+        ['Quote Number:', quote.get('quote_number', 'N/A')],
+        ['Date:', datetime.now().strftime('%B %d, %Y')],
+        ['Valid Until:', datetime.fromisoformat(quote['valid_until']).strftime('%B %d, %Y') if quote.get('valid_until') else 'N/A'],
+        ['Customer:', quote.get('customer_name', 'N/A')],
+        ['Email:', quote.get('customer_email', 'N/A')],
+        ['Company:', quote.get('customer_company', 'N/A') if quote.get('customer_company') else 'N/A']
+    ]
+    
+    elements.append(template.detail_table(quote_info))
+    elements.append(Spacer(1, 20))
+    
+    # Configuration details
+    elements.extend(template.configuration_heading())
+    
+    # Chassis details
+    if chassis_data:
+        chassis_info = [
+            ['Chassis:', f"{chassis_data.get('series', 'N/A')} {chassis_data.get('wheelbase_inches', 'N/A')}\" Wheelbase"],
+            ['Model Year:', str(chassis_data.get('model_year', 'N/A'))],
+            ['GVWR:', f"{chassis_data.get('gvwr_lbs', 'N/A')} lbs"],
+            ['Engine:', chassis_data.get('engine_type', 'N/A')],
+            ['Fuel Type:', chassis_data.get('fuel_type', 'N/A')]
+        ]
+        
+        elements.append(template.detail_table(chassis_info))
+        elements.append(Spacer(1, 12))
+    
+    # Body details
+    if body_data:
+        body_info = [
+            ['Body Configuration:', body_data.get('configuration_name', 'N/A')],
+            ['Length:', f"{body_data.get('length_ft', 'N/A')} ft"],
+            ['Passenger Capacity:', str(body_data.get('passenger_capacity', 'N/A'))],
+            ['Wheelchair Positions:', str(body_data.get('wheelchair_positions', 'N/A'))],
+            ['Fuel Type:', body_data.get('fuel_type', 'N/A')]
+        ]
+        
+        if body_data.get('electric_range_miles'):
+            body_info.append(['Electric Range:', f"{body_data['electric_range_miles']} miles"])
+        
+        elements.append(template.detail_table(body_info))
+        elements.append(Spacer(1, 20))
+    
+    # Pricing
+    elements.extend(template.pricing_heading())
+    
+    pricing_data = [
+        ['Item', 'Price'],
+        ['Chassis (MSRP)', f"${quote.get('base_price', 0):,.2f}"],
+        ['Destination Charge', f"${quote.get('destination_charge', 0):,.2f}"],
+        ['Body Configuration', 'Contact for pricing'],
+        ['', ''],
+        ['TOTAL ESTIMATE', f"${quote.get('total_price', 0):,.2f}+"]
+    ]
+    
+    elements.append(template.pricing_table(pricing_data))
+    elements.append(Spacer(1, 20))
+    
+    # Footer
+    elements.extend(template.footer())
+    
+    return elements
+
+
+def render_quote_pdf(quote, chassis_data, body_data, template=None):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    
+    # Build PDF
+    doc.build(build_quote_elements(quote, chassis_data, body_data, template))
+    
+    # Get PDF data
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_data
+
+
+def render_quotes_pdf(quotes, template=None):
+    # One document with every (quote, chassis_data, body_data) on its own page
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, PageBreak
+    
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    
+    elements = []
+    for quote, chassis_data, body_data in quotes:
+        if elements:
+            elements.append(PageBreak())
+        elements.extend(build_quote_elements(quote, chassis_data, body_data, template))
+    
+    doc.build(elements)
+    
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_data
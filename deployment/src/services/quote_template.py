@@ -0,0 +1,82 @@
+import copy
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle
+
+BRAND_COLOR = colors.HexColor('#7C3AED')
+
+DETAIL_COL_WIDTHS = [2*inch, 4*inch]
+PRICING_COL_WIDTHS = [4*inch, 2*inch]
+
+FOOTER_NOTE = "* Final pricing includes body configuration and options. Contact Endera Motors for complete pricing details."
+FOOTER_CONTACT = "Contact: 1-800-ENDERA-1 | info@enderamotors.com | www.enderamotors.com"
+
+
+class QuoteTemplate:
+    # Styles and static flowables of the quote document, built once per process.
+    # Styles are only read while rendering, so they are shared between threads.
+    # A flowable keeps layout state once wrapped, so every render gets a
+    # shallow copy of the pre-parsed paragraphs instead of the originals.
+
+    def __init__(self):
+        styles = getSampleStyleSheet()
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30,
+            textColor=BRAND_COLOR
+        )
+        self.heading_style = styles['Heading2']
+        self.body_style = styles['Normal']
+
+        self.detail_table_style = TableStyle([
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ])
+        self.pricing_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), BRAND_COLOR),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -2), 1, colors.black),
+            ('LINEBELOW', (0, -1), (-1, -1), 2, BRAND_COLOR),
+        ])
+
+        self._title = Paragraph("ENDERA VEHICLE QUOTE", self.title_style)
+        self._configuration_heading = Paragraph("VEHICLE CONFIGURATION", self.heading_style)
+        self._pricing_heading = Paragraph("PRICING SUMMARY", self.heading_style)
+        self._footer_note = Paragraph(FOOTER_NOTE, self.body_style)
+        self._footer_contact = Paragraph(FOOTER_CONTACT, self.body_style)
+
+    def header(self):
+        return [copy.copy(self._title), Spacer(1, 12)]
+
+    def configuration_heading(self):
+        return [copy.copy(self._configuration_heading), Spacer(1, 12)]
+
+    def pricing_heading(self):
+        return [copy.copy(self._pricing_heading), Spacer(1, 12)]
+
+    def footer(self):
+        return [copy.copy(self._footer_note), Spacer(1, 12), copy.copy(self._footer_contact)]
+
+    def detail_table(self, rows):
+        table = Table(rows, colWidths=DETAIL_COL_WIDTHS)
+        table.setStyle(self.detail_table_style)
+        return table
+
+    def pricing_table(self, rows):
+        table = Table(rows, colWidths=PRICING_COL_WIDTHS)
+        table.setStyle(self.pricing_table_style)
+        return table
+
+
+quote_template = QuoteTemplate()
@@ -0,0 +1,218 @@
+# Write-behind for configuration selections, single worker process only.
+#
+# The buffer lives in the memory of the process that accepted the selection.
+# Reads flush it first, but only in that process: with several workers a
+# pricing or quote request handled by another worker would read stale
+# selections. Write-behind therefore also needs SINGLE_WORKER=true (see
+# services/workers.py).
+#
+# A selection is answered with 202 only after its row passed the checks the
+# database would apply (UUIDs, types, an existing session). A batch the
+# database rejects is retried per session and then row by row, so one bad row
+# can't hold back other sessions. A row rejected SELECTION_MAX_ATTEMPTS times
+# is dropped and logged. While Supabase is unreachable rows are kept, up to
+# SELECTION_BUFFER_MAX, after that selections are inserted synchronously again.
+import atexit
+import json
+import math
+import os
+import threading
+import uuid
+from src.services.supabase_client import supabase, api_error
+from src.services.session_store import session_store
+from src.services.workers import single_worker
+
+# Acknowledge selections right away and write them to Supabase in batches
+SELECTION_WRITE_BEHIND = os.environ.get('SELECTION_WRITE_BEHIND', 'false').lower() == 'true'
+# A flush starts once this many selections are buffered across all sessions...
+SELECTION_FLUSH_SIZE = int(os.environ.get('SELECTION_FLUSH_SIZE', '50'))
+# ...or after this many seconds, whichever comes first
+SELECTION_FLUSH_INTERVAL = float(os.environ.get('SELECTION_FLUSH_INTERVAL', '0.5'))
+SELECTION_BUFFER_MAX = int(os.environ.get('SELECTION_BUFFER_MAX', '10000'))
+SELECTION_MAX_ATTEMPTS = int(os.environ.get('SELECTION_MAX_ATTEMPTS', '3'))
+
+if SELECTION_WRITE_BEHIND:
+    SELECTION_WRITE_BEHIND = single_worker('SELECTION_WRITE_BEHIND')
+
+
+def is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def validate_selection(selection_data):
+    # The configuration_selections constraints, checked before a 202
+    if not is_uuid(selection_data['session_id']):
+        raise ValueError('Invalid session id')
+    selection_type = selection_data['selection_type']
+    if not isinstance(selection_type, str) or not 0 < len(selection_type) <= 50:
+        raise ValueError('selectionType must be a string of at most 50 characters')
+    if selection_data['selected_item_id'] is not None and not is_uuid(selection_data['selected_item_id']):
+        raise ValueError('selectedItemId must be a UUID')
+    code = selection_data['selected_item_code']
+    if code is not None and (not isinstance(code, str) or len(code) > 100):
+        raise ValueError('selectedItemCode must be a string of at most 100 characters')
+    quantity = selection_data['quantity']
+    if isinstance(quantity, bool) or not isinstance(quantity, int):
+        raise ValueError('quantity must be an integer')
+    for field, key in (('unitPrice', 'unit_price'), ('totalPrice', 'total_price')):
+        value = selection_data[key]
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f'{field} must be a number')
+
+
+class SelectionBuffer:
+    # Per-session queues of configuration_selections rows. Every insert runs
+    # under one flush lock, so once flush(session_id) returns, no selection of
+    # that session is still on its way to the database, unless Supabase
+    # failed or rejected it.
+
+    def __init__(self, flush_size=SELECTION_FLUSH_SIZE, flush_interval=SELECTION_FLUSH_INTERVAL,
+                 max_rows=SELECTION_BUFFER_MAX, max_attempts=SELECTION_MAX_ATTEMPTS):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self._buffers = {}
+        self._count = 0
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+
+    def add(self, selection_data):
+        # Ids are assigned here so the caller can answer before the insert.
+        # None when the buffer is full, the caller then inserts it itself.
+        row = dict(selection_data, id=str(uuid.uuid4()))
+        with self._lock:
+            if self._count >= self.max_rows:
+                return None
+            self._buffers.setdefault(row['session_id'], []).append(row)
+            self._count += 1
+            full = self._count >= self.flush_size
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+        return row
+
+    def flush(self, session_id):
+        with self._flush_lock:
+            with self._lock:
+                rows = self._buffers.pop(session_id, [])
+                self._count -= len(rows)
+            self._insert(rows)
+
+    def flush_all(self):
+        with self._flush_lock:
+            with self._lock:
+                buffers = self._buffers
+                self._buffers = {}
+                self._count = 0
+            rows = [row for buffered in buffers.values() for row in buffered]
+            self._insert(rows)
+
+    def _insert(self, rows):
+        # One insert for the batch. When the database rejects it, one insert
+        # per session, then per row of a rejected session.
+        if not rows:
+            return
+        try:
+            self._write(rows)
+            return
+        except api_error():
+            pass
+        except Exception:
+            self._requeue(rows)
+            raise
+
+        sessions = {}
+        for row in rows:
+            sessions.setdefault(row['session_id'], []).append(row)
+        session_rows = list(sessions.values())
+        for index, batch in enumerate(session_rows):
+            try:
+                self._insert_session(batch, try_batch=len(session_rows) > 1)
+            except Exception:
+                self._requeue([row for later in session_rows[index + 1:] for row in later])
+                raise
+
+    def _insert_session(self, rows, try_batch):
+        if try_batch and len(rows) > 1:
+            try:
+                self._write(rows)
+                return
+            except api_error():
+                pass
+            except Exception:
+                self._requeue(rows)
+                raise
+
+        rejected = []
+        for index, row in enumerate(rows):
+            try:
+                self._write([row])
+            except api_error() as e:
+                rejected.append((row, e))
+            except Exception:
+                self._requeue([failed for failed, _ in rejected] + rows[index:])
+                raise
+
+        retry = []
+        for row, error in rejected:
+            attempts = self._attempts.get(row['id'], 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(row['id'], None)
+                print(f"Selection dropped after {attempts} rejected inserts: {error} {json.dumps(row, default=str)}")
+            else:
+                self._attempts[row['id']] = attempts
+                retry.append(row)
+        self._requeue(retry)
+
+    def _write(self, rows):
+        supabase.table('configuration_selections').insert(rows).execute()
+        for row in rows:
+            self._attempts.pop(row['id'], None)
+        for session_id in {row['session_id'] for row in rows}:
+            session_store.invalidate(session_id)
+
+    def _requeue(self, rows):
+        # Put the rows back in front of anything buffered since, in order
+        if not rows:
+            return
+        with self._lock:
+            for row in reversed(rows):
+                self._buffers.setdefault(row['session_id'], []).insert(0, row)
+            self._count += len(rows)
+
+    def _ensure_thread(self):
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='selection-flush', daemon=True)
+                self._thread.start()
+                atexit.register(self.flush_all)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush_all()
+            except Exception as e:
+                print(f"Selection flush error: {e}")
+
+
+selection_buffer = SelectionBuffer()
+
+
+def flush_session_selections(session_id):
+    # Called before any read that has to see the session's latest selections
+    if SELECTION_WRITE_BEHIND:
+        selection_buffer.flush(session_id)
@@ -0,0 +1,187 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from src.services.supabase_client import supabase
+from src.services.app_data import app_data_path, ensure_parent_dir
+from src.services.workers import single_worker
+
+# memory: per-process LRU, single worker only. Another worker would keep
+# serving its own copy after a write, for up to SESSION_STORE_TTL.
+# sqlite: file shared by every worker process on the host
+# none: always read configuration_sessions from Supabase
+SESSION_STORE_BACKEND = os.environ.get('SESSION_STORE_BACKEND', 'none').lower()
+SESSION_STORE_MAX_ENTRIES = int(os.environ.get('SESSION_STORE_MAX_ENTRIES', '10000'))
+SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH') or app_data_path('sessions.sqlite3')
+# Upper bound on how long a cached row is trusted, even before expires_at
+SESSION_STORE_TTL = float(os.environ.get('SESSION_STORE_TTL', '300'))
+
+
+class MemorySessionBackend:
+
+    def __init__(self, max_entries=SESSION_STORE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None:
+                self._entries.move_to_end(session_id)
+            return entry
+
+    def put(self, session_id, row, expires, expected_version=None):
+        with self._lock:
+            version = self._entries.get(session_id, (0, 0, None))[0]
+            if expected_version is not None and version != expected_version:
+                return False
+            self._entries[session_id] = (version + 1, expires, row)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, session_id):
+        self.put(session_id, None, 0)
+
+
+class SqliteSessionBackend:
+    # One connection per thread, WAL so readers in other workers never block
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path=SESSION_STORE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._writes = 0
+        ensure_parent_dir(path)
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            'id TEXT PRIMARY KEY, version INTEGER NOT NULL, expires REAL NOT NULL, data TEXT)'
+        )
+
+    def get(self, session_id):
+        result = self._connect().execute(
+            'SELECT version, expires, data FROM sessions WHERE id = ?', (session_id,)
+        ).fetchone()
+        if result is None:
+            return None
+        version, expires, data = result
+        return version, expires, json.loads(data) if data is not None else None
+
+    def put(self, session_id, row, expires, expected_version=None):
+        conn = self._connect()
+        data = json.dumps(row) if row is not None else None
+        if expected_version is None:
+            cursor = conn.execute(
+                'INSERT INTO sessions (id, version, expires, data) VALUES (?, 1, ?, ?) '
+                'ON CONFLICT(id) DO UPDATE SET version = version + 1, expires = excluded.expires, data = excluded.data',
+                (session_id, expires, data)
+            )
+        elif expected_version == 0:
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO sessions (id, version, expires, data) VALUES (?, 1, ?, ?)',
+                (session_id, expires, data)
+            )
+        else:
+            cursor = conn.execute(
+                'UPDATE sessions SET version = version + 1, expires = ?, data = ? WHERE id = ? AND version = ?',
+                (expires, data, session_id, expected_version)
+            )
+
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            conn.execute('DELETE FROM sessions WHERE expires < ?', (time.time() - SESSION_STORE_TTL,))
+        return cursor.rowcount > 0
+
+    def invalidate(self, session_id):
+        self.put(session_id, None, 0)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+
+class SessionStore:
+    # Read-through / write-through cache for configuration_sessions rows.
+    # Every write bumps the entry's version; a read-through only installs the
+    # row it fetched if nobody wrote or invalidated the entry in the meantime.
+
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def get(self, session_id):
+        if self.backend is None:
+            return fetch_session(session_id)
+
+        version, row = self.lookup(session_id)
+        if row is not None:
+            return row
+
+        row = fetch_session(session_id)
+        self.fill(session_id, row, version)
+        return row
+
+    def lookup(self, session_id):
+        # (entry version, cached row or None), for callers doing their own fetch
+        entry = self.backend.get(session_id)
+        if entry is None:
+            return 0, None
+        version, expires, row = entry
+        if row is not None and expires > time.time():
+            return version, row
+        return version, None
+
+    def fill(self, session_id, row, version):
+        # Installs a fetched row unless the entry changed since lookup()
+        if row is not None:
+            self.backend.put(session_id, row, session_expiry(row), expected_version=version)
+
+    def put(self, row):
+        if self.backend is not None:
+            self.backend.put(str(row['id']), row, session_expiry(row))
+
+    def invalidate(self, session_id):
+        if self.backend is not None:
+            self.backend.invalidate(str(session_id))
+
+
+def fetch_session(session_id):
+    response = supabase.table('configuration_sessions').select('*').eq('id', session_id).execute()
+    return response.data[0] if response.data else None
+
+
+def session_expiry(row):
+    expiry = time.time() + SESSION_STORE_TTL
+    if row.get('expires_at'):
+        try:
+            expiry = min(expiry, datetime.fromisoformat(row['expires_at']).timestamp())
+        except ValueError:
+            pass
+    return expiry
+
+
+def create_backend(name):
+    if name == 'memory':
+        if not single_worker('SESSION_STORE_BACKEND=memory'):
+            return None
+        return MemorySessionBackend()
+    if name == 'sqlite':
+        return SqliteSessionBackend()
+    return None
+
+
+session_store = SessionStore(create_backend(SESSION_STORE_BACKEND))
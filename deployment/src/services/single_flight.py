@@ -0,0 +1,85 @@
+import asyncio
+import threading
+
+
+def copy_error(error):
+    # A waiter's own copy of the shared call's exception. Raising one
+    # instance in several threads would keep rewriting its __traceback__.
+    copied = type(error).__new__(type(error))
+    copied.args = error.args
+    copied.__dict__.update(error.__dict__)
+    return copied
+
+
+class _Call:
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    # Concurrent do() calls with the same key share one call of fn: the first
+    # caller runs it, the others wait for its result (or a copy of its
+    # exception, chained to the original). Nothing is cached, the next call
+    # after it finished runs fn again.
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        # Returns (result, shared), shared is True for callers that waited
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise copy_error(call.error) from call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    # SingleFlight for coroutines on one event loop. The shared call runs as
+    # its own task, so a caller that is cancelled doesn't cancel it for the others.
+
+    def __init__(self):
+        self._tasks = {}
+
+    async def do(self, key, fn):
+        task = self._tasks.get(key)
+        shared = task is not None
+        if not shared:
+            task = self._tasks[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._finish(key, done))
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if shared:
+                raise copy_error(e) from e
+            raise
+
+    def _finish(self, key, task):
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+        # Every caller may have been cancelled, don't log "exception never retrieved"
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,94 @@
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from flask import current_app, request, send_file
+from src.services.compression import COMPRESSIBLE_MIMETYPES, COMPRESS_MIN_SIZE, choose_encoding, compress
+
+# Files up to this size are kept in memory, larger ones are sent from disk
+STATIC_MEMORY_MAX_BYTES = int(os.environ.get('STATIC_MEMORY_MAX_BYTES', str(2 * 1024 * 1024)))
+
+# Vite writes fingerprinted files (index-D1Yyslax.js) to assets/, those never change in place
+ASSET_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+FINGERPRINTED = re.compile(r'^assets/.+-[A-Za-z0-9_-]{8}\.\w+$')
+
+
+class StaticFile:
+    # One manifest entry. Compressed variants are built on first use at the
+    # highest level and kept next to the raw bytes.
+
+    def __init__(self, path, file_path):
+        file_stat = os.stat(file_path)
+        self.path = path
+        self.file_path = file_path
+        self.size = file_stat.st_size
+        self.mtime = file_stat.st_mtime
+        self.mimetype = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        self.immutable = bool(FINGERPRINTED.match(path))
+
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        self.etag = digest.hexdigest()[:32]
+
+        self.data = None
+        if self.size <= STATIC_MEMORY_MAX_BYTES:
+            with open(file_path, 'rb') as f:
+                self.data = f.read()
+
+        self.compressible = (self.data is not None and self.size >= COMPRESS_MIN_SIZE
+                             and self.mimetype in COMPRESSIBLE_MIMETYPES)
+        self._compressed = {}
+        self._lock = threading.Lock()
+
+    def compressed(self, encoding):
+        data = self._compressed.get(encoding)
+        if data is None:
+            data = compress(self.data, encoding, gzip_level=9, brotli_quality=11)
+            with self._lock:
+                self._compressed[encoding] = data
+        return data
+
+
+class StaticManifest:
+    # The static folder scanned once at startup, so serving a file or the SPA
+    # shell needs no filesystem calls. Restart the app after replacing the build.
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.files = {}
+        if folder and os.path.isdir(folder):
+            for root, _, names in os.walk(folder):
+                for name in names:
+                    file_path = os.path.join(root, name)
+                    path = os.path.relpath(file_path, folder).replace(os.sep, '/')
+                    self.files[path] = StaticFile(path, file_path)
+        self.index = self.files.get('index.html')
+
+    def get(self, path):
+        return self.files.get(path)
+
+
+def send_static(entry):
+    encoding = choose_encoding() if entry.compressible else None
+
+    if entry.data is None:
+        response = send_file(entry.file_path, mimetype=entry.mimetype, etag=entry.etag,
+                             last_modified=entry.mtime, conditional=True)
+    else:
+        data = entry.compressed(encoding) if encoding else entry.data
+        response = current_app.response_class(data, mimetype=entry.mimetype)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+            response.set_etag(f'{entry.etag}-{encoding}')
+        else:
+            response.set_etag(entry.etag)
+        response.last_modified = entry.mtime
+        response = response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+
+    if entry.compressible:
+        response.vary.add('Accept-Encoding')
+    response.headers['Cache-Control'] = ASSET_CACHE_CONTROL if entry.immutable else 'no-cache'
+    return response
@@ -0,0 +1,27 @@
+import time
+from src.services.supabase_client import supabase
+from src.services.catalog_cache import catalog_cache
+from src.services.pdf_jobs import pdf_render_queue
+
+
+def warm_numpy():
+    import numpy
+
+
+# The one-off costs kept out of startup, in the order a first visitor meets them
+WARMUP_STEPS = (
+    ('supabase', supabase.get),
+    ('catalog', catalog_cache.get),
+    ('numpy', warm_numpy),
+    ('pdfWorkers', pdf_render_queue.warm_up)
+)
+
+
+def warm_up():
+    # Returns milliseconds per step, near zero once the process is warm
+    timings = {}
+    for name, step in WARMUP_STEPS:
+        start = time.perf_counter()
+        step()
+        timings[name] = round((time.perf_counter() - start) * 1000, 1)
+    return timings
@@ -0,0 +1,68 @@
+# Guard for features that keep state in the memory of one worker process.
+#
+# Selection write-behind, the memory session store, in-process PDF job state
+# and the metrics registry are only correct when every request reaches the
+# same process. The worker count can be set where the app cannot see it (an
+# expression in a gunicorn config file, a process manager starting several
+# copies), so those features need SINGLE_WORKER=true as well: the deployment
+# states that it runs one worker. A worker count found on the command line,
+# in GUNICORN_CMD_ARGS, WEB_CONCURRENCY or the gunicorn config file still
+# overrides it.
+import os
+import re
+import sys
+
+SINGLE_WORKER = os.environ.get('SINGLE_WORKER', 'false').lower() == 'true'
+
+WORKERS_ARG = re.compile(r'(?:^|\s)(?:-w|--workers)[ =]?(\d+)')
+CONFIG_ARG = re.compile(r'(?:^|\s)(?:-c|--config)[ =]?(\S+)')
+CONFIG_WORKERS = re.compile(r'^workers\s*=\s*(\d+)\s*(?:#.*)?$', re.MULTILINE)
+DEFAULT_GUNICORN_CONFIG = 'gunicorn.conf.py'
+
+
+def configured_workers():
+    # Worker count as gunicorn and uvicorn read it: command line first, then
+    # GUNICORN_CMD_ARGS, then WEB_CONCURRENCY, then `workers = N` in the
+    # gunicorn config file. None when the config sets it in a way we can't read.
+    sources = (' '.join(sys.argv[1:]), os.environ.get('GUNICORN_CMD_ARGS', ''))
+    for args in sources:
+        match = WORKERS_ARG.search(args)
+        if match:
+            return int(match.group(1))
+    if os.environ.get('WEB_CONCURRENCY'):
+        return int(os.environ['WEB_CONCURRENCY'])
+
+    config_path = None
+    for args in sources:
+        match = CONFIG_ARG.search(args)
+        if match:
+            config_path = match.group(1)
+            break
+    if config_path is None and 'gunicorn' in os.path.basename(sys.argv[0]):
+        config_path = DEFAULT_GUNICORN_CONFIG
+    if config_path is None or config_path.startswith('python:'):
+        return 1
+    try:
+        with open(config_path) as f:
+            config = f.read()
+    except OSError:
+        return 1
+    if 'workers' not in config:
+        return 1
+    match = CONFIG_WORKERS.search(config)
+    return int(match.group(1)) if match else None
+
+
+def single_worker(setting):
+    # True when a single-worker-only setting may be used, otherwise prints
+    # why it is ignored
+    if not SINGLE_WORKER:
+        print(f"WARNING: {setting} ignored, it keeps state in one worker process. "
+              "Set SINGLE_WORKER=true if the app runs as exactly one worker")
+        return False
+    workers = configured_workers()
+    if workers != 1:
+        print(f"WARNING: {setting} ignored, SINGLE_WORKER is set but "
+              f"{workers or 'an unknown number of'} workers are configured")
+        return False
+    return True
@@ -0,0 +1,40 @@
+import os
+import sys
+import pytest
+
+# Tests import the app as src.*, the way it runs from /deployment
+DEPLOYMENT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DEPLOYMENT_DIR)
+
+# Nothing in the suite talks to Supabase, keep the snapshot file out of the way
+os.environ.setdefault('CATALOG_SNAPSHOT_PATH', '')
+
+
+@pytest.fixture
+def app():
+    from src.main_full import app
+    app.config['TESTING'] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr('src.routes.admin.ADMIN_TOKEN', 'test-token')
+    return 'test-token'
+
+
+@pytest.fixture
+def catalog(monkeypatch):
+    # The benchmark fixture catalog, served without Supabase
+    import json
+    from src.services.catalog_cache import catalog_cache, CatalogSnapshot
+    with open(os.path.join(DEPLOYMENT_DIR, 'benchmarks', 'fixtures', 'catalog.json')) as f:
+        tables = json.load(f)
+    snapshot = CatalogSnapshot(tables['chassis'], tables['body_configurations'], version='test')
+    monkeypatch.setattr(catalog_cache, 'get', lambda: snapshot)
+    return snapshot
@@ -0,0 +1,57 @@
+import asyncio
+import time
+from src.services.asgi_app import AsyncRequest, AsyncResponse
+from src.services.async_bundle import load_selected_items_async
+from src.routes.quotes import quote_pdf_response
+
+QUOTE = {'quote_number': 'ENQ-1', 'customer_name': 'A B'}
+
+
+def async_request(headers):
+    scope = {'method': 'GET', 'path': '/api/quotes/q-1/pdf', 'query_string': b'',
+             'headers': [(name.lower().encode(), value.encode()) for name, value in headers.items()]}
+    return AsyncRequest(scope, None)
+
+
+def test_pdf_response_honours_range_from_an_async_request():
+    request = async_request({'Range': 'bytes=0-3'})
+    response = AsyncResponse.from_response(quote_pdf_response(b'%PDF-1.4 body', QUOTE, 'key', request.environ))
+    assert response.status == 206
+    assert response.body == b'%PDF'
+    assert response.headers['Content-Range'] == 'bytes 0-3/13'
+
+
+def test_pdf_response_answers_304_for_a_matching_etag():
+    request = async_request({'If-None-Match': '"key"'})
+    response = AsyncResponse.from_response(quote_pdf_response(b'%PDF', QUOTE, 'key', request.environ))
+    assert response.status == 304
+    assert response.body == b''
+
+
+def test_pdf_response_names_the_attachment():
+    response = quote_pdf_response(b'%PDF', QUOTE, 'key', async_request({}).environ)
+    assert response.headers['Content-Disposition'].startswith('attachment; filename=')
+    assert response.headers['ETag'] == '"key"'
+
+
+def test_slow_catalog_does_not_block_the_event_loop(monkeypatch, catalog):
+    def slow_get():
+        time.sleep(0.3)
+        return catalog
+    monkeypatch.setattr('src.services.async_bundle.catalog_cache.get', slow_get)
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await load_selected_items_async({})
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) > 10
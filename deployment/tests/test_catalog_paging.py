@@ -0,0 +1,47 @@
+import pytest
+
+
+def codes(rows):
+    return [row['code'] for row in rows]
+
+
+@pytest.mark.parametrize('path, attribute', [('/api/chassis', 'chassis'), ('/api/bodies', 'bodies')])
+def test_lists_keep_catalog_order_without_paging(client, catalog, path, attribute):
+    assert codes(client.get(path).get_json()) == codes(getattr(catalog, attribute))
+
+
+@pytest.mark.parametrize('path, attribute', [('/api/chassis', 'chassis'), ('/api/bodies', 'bodies')])
+def test_lists_page_by_code(client, catalog, path, attribute):
+    seen = []
+    response = client.get(f'{path}?limit=2')
+    while True:
+        seen.extend(response.get_json())
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+        response = client.get(f'{path}?limit=2&cursor={cursor}')
+    assert codes(seen) == sorted(codes(getattr(catalog, attribute)))
+
+
+def test_catalog_keeps_catalog_order_without_paging(client, catalog):
+    vehicles = client.get('/api/catalog/vehicles').get_json()['vehicles']
+    assert codes(vehicles) == codes(catalog.bodies)
+
+
+def test_catalog_pages_by_code_without_sort(client, catalog):
+    seen = []
+    url = '/api/catalog/vehicles?limit=3'
+    while url:
+        page = client.get(url).get_json()
+        seen.extend(page['vehicles'])
+        url = f"/api/catalog/vehicles?limit=3&cursor={page['nextCursor']}" if page['nextCursor'] else None
+    assert codes(seen) == sorted(codes(catalog.bodies))
+
+
+@pytest.mark.parametrize('path', ['/api/chassis', '/api/bodies', '/api/catalog/vehicles'])
+def test_limit_rules_match(client, catalog, path):
+    empty = client.get(f'{path}?limit=0')
+    assert empty.status_code == 200
+    body = empty.get_json()
+    assert (body['vehicles'] if 'vehicles' in body else body) == []
+    assert client.get(f'{path}?limit=-1').status_code == 400
@@ -0,0 +1,34 @@
+import os
+import tempfile
+import time
+from src.services import catalog_store
+from src.services.catalog_store import save_catalog_snapshot, load_catalog_snapshot
+
+CHASSIS = [{'id': 'c-1', 'chassis_code': 'E3F-138-DRW'}]
+BODIES = [{'id': 'b-1', 'configuration_code': 'B4-24G'}]
+
+
+def test_default_path_is_not_shared_tmp():
+    assert not catalog_store.app_data_path('catalog.snapshot').startswith(tempfile.gettempdir())
+
+
+def test_recent_snapshot_is_loaded(tmp_path):
+    path = str(tmp_path / 'data' / 'catalog.snapshot')
+    loaded_at = time.time()
+    save_catalog_snapshot(CHASSIS, BODIES, loaded_at, path)
+    assert load_catalog_snapshot(path, max_age=3600) == (CHASSIS, BODIES, loaded_at)
+
+
+def test_old_file_is_ignored(tmp_path):
+    path = str(tmp_path / 'catalog.snapshot')
+    save_catalog_snapshot(CHASSIS, BODIES, time.time(), path)
+    os.utime(path, (time.time() - 7200,) * 2)
+    assert load_catalog_snapshot(path, max_age=3600) is None
+
+
+def test_old_or_future_load_time_is_ignored(tmp_path):
+    path = str(tmp_path / 'catalog.snapshot')
+    save_catalog_snapshot(CHASSIS, BODIES, time.time() - 7200, path)
+    assert load_catalog_snapshot(path, max_age=3600) is None
+    save_catalog_snapshot(CHASSIS, BODIES, time.time() + 86400, path)
+    assert load_catalog_snapshot(path, max_age=3600) is None
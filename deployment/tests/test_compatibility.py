@@ -0,0 +1,109 @@
+import pytest
+from src.main import DEMO_CHASSIS, DEMO_BODIES
+from src.services.compatibility import is_compatible, CompatibilityIndex
+from src.routes.quotes import quote_created
+
+
+def chassis_row(demo):
+    return {'id': demo['id'], 'chassis_code': demo['code'], 'wheelbase_inches': demo['wheelbase'], 'gvwr_lbs': demo['gvwr']}
+
+
+def body_row(demo):
+    return {'id': demo['id'], 'configuration_code': demo['code'], 'length_ft': demo['length'], 'passenger_capacity': demo['passengers']}
+
+
+@pytest.mark.parametrize('chassis', DEMO_CHASSIS, ids=lambda row: row['code'])
+@pytest.mark.parametrize('body', DEMO_BODIES, ids=lambda row: row['code'])
+def test_demo_catalog_pairs_are_compatible(chassis, body):
+    assert is_compatible(chassis_row(chassis), body_row(body))
+
+
+def test_demo_catalog_index_has_every_pair():
+    index = CompatibilityIndex([chassis_row(c) for c in DEMO_CHASSIS], [body_row(b) for b in DEMO_BODIES])
+    for chassis in DEMO_CHASSIS:
+        assert index.body_positions_for(chassis['id']) == list(range(len(DEMO_BODIES)))
+
+
+def test_weight_rule_needs_real_weights():
+    chassis = {'gvwr_lbs': 10000, 'curb_weight_lbs': 6000}
+    assert is_compatible(chassis, {'passenger_capacity': 20})
+    assert not is_compatible(chassis, {'passenger_capacity': 20, 'body_weight_lbs': 2000})
+    assert is_compatible(chassis, {'passenger_capacity': 10, 'body_weight_lbs': 2000})
+
+
+def test_length_rule_needs_a_chassis_limit():
+    assert is_compatible({'wheelbase_inches': 138}, {'length_ft': 25})
+    assert not is_compatible({'max_body_length_ft': 22}, {'length_ft': 25})
+
+
+def test_warnings_are_added_to_the_created_quote():
+    quote = {'id': 'q-1', 'quote_number': 'Q-1', 'customer_name': 'A', 'customer_email': 'a@b.c',
+             'total_price': 1, 'valid_until': None, 'created_at': None}
+    assert 'warnings' not in quote_created({}, quote, None, None, None)
+    result = quote_created({}, quote, None, None, None, ['may not fit'])
+    assert result['warnings'] == ['may not fit']
+
+
+class FakeCatalogTables:
+    # Answers the catalog load with the fixture rows, remembering the columns asked for
+    def __init__(self, tables):
+        self.tables = tables
+        self.columns = {}
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+class FakeQuery:
+    def __init__(self, tables, name):
+        self.tables = tables
+        self.name = name
+
+    def select(self, columns):
+        self.tables.columns[self.name] = columns
+        return self
+
+    def execute(self):
+        return type('Response', (), {'data': self.tables.tables[self.name]})()
+
+
+def test_catalog_index_rejects_pairs_from_loaded_rows(monkeypatch):
+    import copy
+    import json
+    import os
+    from conftest import DEPLOYMENT_DIR
+    from src.services import catalog_cache as catalog_cache_module
+    from src.services.catalog_cache import CatalogCache
+
+    with open(os.path.join(DEPLOYMENT_DIR, 'benchmarks', 'fixtures', 'catalog.json')) as f:
+        tables = json.load(f)
+    coach = dict(copy.deepcopy(tables['body_configurations'][-1]), id='coach', configuration_code='B6-36G', length_ft=36)
+    stub = dict(copy.deepcopy(tables['body_configurations'][0]), id='stub', configuration_code='B1-12G', length_ft=12)
+    tables['body_configurations'] += [coach, stub]
+    fake = FakeCatalogTables(tables)
+    monkeypatch.setattr(catalog_cache_module, 'supabase', fake)
+
+    snapshot = CatalogCache(snapshot_path='').refresh()
+
+    assert fake.columns['chassis'] == '*'
+    index = snapshot.compatibility
+    codes = {row['id']: row['chassis_code'] for row in tables['chassis']}
+    rejected = {
+        (codes[chassis['id']], body['configuration_code'])
+        for chassis in tables['chassis'] for body in tables['body_configurations']
+        if not index.compatible(chassis['id'], body['id'])
+    }
+    assert ('E3F-138-DRW', 'B6-36G') in rejected
+    assert ('E4F-176-DRW', 'B1-12G') in rejected
+    assert all(body in ('B6-36G', 'B1-12G') for _, body in rejected)
+    assert len(index.buildable_body_positions()) == len(tables['body_configurations']) - 1
+    # The quote path checks the same rows with the same rules
+    for chassis in tables['chassis']:
+        for body in tables['body_configurations']:
+            assert is_compatible(chassis, body) == index.compatible(chassis['id'], body['id'])
+
+
+def test_length_rule_bounds_body_length_by_wheelbase():
+    assert not is_compatible({'wheelbase_inches': 138}, {'length_ft': 30})
+    assert not is_compatible({'wheelbase_inches': 176}, {'length_ft': 14})
+    assert is_compatible({'wheelbase_inches': 176}, {'length_ft': '16'})
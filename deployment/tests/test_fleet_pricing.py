@@ -0,0 +1,57 @@
+import pytest
+from src.services.fleet_pricing import fleet_assumptions, DEFAULT_ASSUMPTIONS
+
+
+def test_defaults_apply_when_nothing_is_given():
+    assert fleet_assumptions() == DEFAULT_ASSUMPTIONS
+
+
+def test_overrides_are_parsed_as_numbers():
+    values = fleet_assumptions({'milesPerGallon': '12.5', 'unknown': 'ignored'})
+    assert values['milesPerGallon'] == 12.5
+    assert 'unknown' not in values
+
+
+@pytest.mark.parametrize('key', ['milesPerGallon', 'operatingDaysPerYear', 'annualMiles', 'years'])
+@pytest.mark.parametrize('value', [0, -1])
+def test_divisors_must_be_positive(key, value):
+    with pytest.raises(ValueError, match=f'{key} must be greater than 0'):
+        fleet_assumptions({key: value})
+
+
+def test_costs_may_be_zero_but_not_negative():
+    assert fleet_assumptions({'fuelCostPerGallon': 0})['fuelCostPerGallon'] == 0
+    with pytest.raises(ValueError, match='fuelCostPerGallon must not be negative'):
+        fleet_assumptions({'fuelCostPerGallon': -3})
+
+
+@pytest.mark.parametrize('value', ['abc', None, 'nan', 'inf'])
+def test_non_numbers_are_rejected(value):
+    with pytest.raises(ValueError, match='milesPerGallon must be a number'):
+        fleet_assumptions({'milesPerGallon': value})
+
+
+@pytest.mark.parametrize('assumptions', [{'milesPerGallon': 0}, {'operatingDaysPerYear': 0}, {'operatingDaysPerYear': -250}])
+def test_compare_answers_400_for_bad_assumptions(client, assumptions):
+    response = client.post('/api/pricing/fleet/compare', json={'candidates': [{'chassisId': 'c-1'}], 'assumptions': assumptions})
+    assert response.status_code == 400
+    assert 'must be greater than 0' in response.get_json()['error']
+
+
+@pytest.mark.parametrize('quantity, error', [
+    ('Infinity', 'quantity must be a number'),
+    (1e400, 'quantity must be a number'),
+    (10 ** 400, 'quantity must be a number'),
+    (-2, 'quantity must not be negative'),
+    (1.5, 'quantity must be a whole number'),
+])
+def test_compare_reports_bad_quantities_per_candidate(client, catalog, quantity, error):
+    chassis_id = catalog.chassis[0]['id']
+    response = client.post('/api/pricing/fleet/compare', json={'candidates': [
+        {'chassisId': chassis_id, 'quantity': quantity},
+        {'chassisId': chassis_id, 'quantity': '3'}
+    ]})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['errors'] == [{'index': 0, 'error': error}]
+    assert [(result['index'], result['quantity']) for result in data['results']] == [(1, 3)]
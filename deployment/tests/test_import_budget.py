@@ -0,0 +1,12 @@
+import os
+import subprocess
+import sys
+from conftest import DEPLOYMENT_DIR
+
+
+def test_app_imports_within_budget():
+    # Over IMPORT_BUDGET_MS (400 ms by default), or Supabase, ReportLab or
+    # NumPy imported at startup, fails the script and with it this test
+    result = subprocess.run([sys.executable, os.path.join('benchmarks', 'import_budget.py')],
+                            cwd=DEPLOYMENT_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,39 @@
+import json
+from src.services.metrics import MetricsRegistry, MultiProcessWriter
+
+
+def test_metrics_need_a_token_unless_public(client, monkeypatch):
+    monkeypatch.setattr('src.services.metrics.METRICS_TOKEN', None)
+    assert client.get('/metrics').status_code == 404
+
+    monkeypatch.setattr('src.services.metrics.METRICS_PUBLIC', True)
+    assert client.get('/metrics').status_code == 200
+
+    monkeypatch.setattr('src.services.metrics.METRICS_TOKEN', 'scrape')
+    assert client.get('/metrics').status_code == 403
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape'})
+    assert response.status_code == 200
+    assert 'endera_http_requests_total' in response.get_data(as_text=True)
+
+
+def test_multiprocess_scrape_sums_every_worker(tmp_path):
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests.', ('route',))
+    latency = registry.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0))
+    requests.inc('/a')
+    latency.observe(0.05, '/a')
+
+    other = MetricsRegistry()
+    other.counter('requests_total', 'Requests.', ('route',)).inc('/a', amount=2)
+    other.metrics[0].inc('/b')
+    other.histogram('latency_seconds', 'Latency.', ('route',), buckets=(0.1, 1.0)).observe(0.5, '/a')
+    (tmp_path / '99999.json').write_text(json.dumps(other.dump()))
+
+    text = MultiProcessWriter(registry, str(tmp_path)).render()
+
+    assert 'requests_total{route="/a"} 3' in text
+    assert 'requests_total{route="/b"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'latency_seconds_count{route="/a"} 2' in text
+    assert 'latency_seconds_sum{route="/a"} 0.55' in text
@@ -0,0 +1,31 @@
+import os
+import time
+from src.services.pdf_cache import PdfCache
+
+
+def test_disk_tier_is_swept_by_age_and_size(tmp_path):
+    cache = PdfCache(directory=str(tmp_path), directory_max_bytes=250, max_age=3600)
+    for index in range(4):
+        cache.put(f'q{index}', f'k{index}', b'x' * 100)
+        os.utime(tmp_path / f'k{index}.pdf', (time.time() - 10 + index,) * 2)
+    stale = tmp_path / 'stale.pdf'
+    stale.write_bytes(b'x')
+    os.utime(stale, (time.time() - 7200,) * 2)
+
+    cache.sweep()
+
+    assert sorted(os.listdir(tmp_path)) == ['k2.pdf', 'k3.pdf']
+
+
+def test_expired_disk_files_are_not_served(tmp_path):
+    cache = PdfCache(directory=str(tmp_path), max_age=60)
+    (tmp_path / 'old.pdf').write_bytes(b'%PDF')
+    os.utime(tmp_path / 'old.pdf', (time.time() - 120,) * 2)
+    assert cache.get('old') is None
+
+
+def test_quote_map_is_bounded(tmp_path):
+    cache = PdfCache(max_quotes=2)
+    for index in range(5):
+        cache.put(f'q{index}', f'k{index}', b'%PDF')
+    assert list(cache._keys_by_quote) == ['q3', 'q4']
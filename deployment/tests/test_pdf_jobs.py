@@ -0,0 +1,39 @@
+import os
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+from src.services.pdf_jobs import PdfRenderQueue, PdfRenderJob
+
+
+def test_jobs_are_visible_to_other_workers(tmp_path):
+    owner = PdfRenderQueue(workers=0, jobs_dir=str(tmp_path))
+    other = PdfRenderQueue(workers=0, jobs_dir=str(tmp_path))
+    job = PdfRenderJob('quote-1', 'key')
+    job.finished_at = None
+    owner._save(job)
+
+    assert other.get(job.id).to_dict()['status'] == 'queued'
+    job.finished_at = job.created_at
+    owner._save(job)
+    assert other.get(job.id).to_dict() == job.to_dict()
+    assert other.get('../jobs/' + job.id) is None
+    assert other.get('not-a-job') is None
+
+
+def test_pool_is_replaced_after_a_worker_dies():
+    queue = PdfRenderQueue(workers=1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            queue.run(os._exit, 1)
+        assert queue.run(pow, 2, 10) == 1024
+    finally:
+        queue._get_executor().shutdown()
+
+
+def test_shutdown_stops_the_workers():
+    queue = PdfRenderQueue(workers=1)
+    assert queue.run(pow, 2, 3) == 8
+    processes = list(queue._executor._processes.values())
+    queue.shutdown()
+    assert queue._executor is None
+    assert not any(process.is_alive() for process in processes)
+    queue.shutdown()
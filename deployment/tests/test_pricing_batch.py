@@ -0,0 +1,28 @@
+import pytest
+from src.services.pricing_engine import pricing_engine
+
+
+@pytest.mark.parametrize('option, error', [
+    ({'code': 'A', 'unitPrice': -5}, 'options[0].unitPrice must not be negative'),
+    ({'code': 'A', 'unitPrice': 'NaN'}, 'options[0].unitPrice must be a number'),
+    ({'code': 'A', 'unitPrice': 'Infinity'}, 'options[0].unitPrice must be a number'),
+    ({'code': 'A', 'unitPrice': 10, 'quantity': 2.9}, 'options[0].quantity must be a whole number'),
+    ({'code': 'A', 'unitPrice': 10, 'quantity': 1e400}, 'options[0].quantity must be a number'),
+    ({'code': 'A', 'unitPrice': 10, 'quantity': -1}, 'options[0].quantity must not be negative'),
+    ('A', 'options[0] must be an object'),
+])
+def test_bad_options_are_reported_per_configuration(client, catalog, option, error):
+    chassis_id = catalog.chassis[0]['id']
+    response = client.post('/api/pricing/estimate/batch', json={'configurations': [
+        {'chassisId': chassis_id, 'options': [option]},
+        {'chassisId': chassis_id, 'options': [{'code': 'A', 'unitPrice': '12.5', 'quantity': 2.0}]}
+    ]})
+    assert response.status_code == 200
+    first, second = response.get_json()['estimates']
+    assert first == {'index': 0, 'error': error}
+    assert second['optionsPrice'] == 25
+
+
+def test_huge_integer_quantity_is_not_an_overflow(catalog):
+    with pytest.raises(ValueError, match='quantity must be a number'):
+        pricing_engine.estimate(catalog.chassis[0]['id'], options=[{'unitPrice': 1, 'quantity': 10 ** 400}])
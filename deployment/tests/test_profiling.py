@@ -0,0 +1,39 @@
+import threading
+import time
+from flask import g
+from src.services.pdf_jobs import PdfRenderQueue, timed_render
+from src.services.profiling import sampler, WORKER_ROOT, hot_functions
+from src.services.quote_pdf import render_quote_pdf
+
+QUOTE = {'quote_number': 'ENQ-1', 'customer_name': 'A B', 'customer_email': 'a@b.c',
+         'base_price': 41585, 'destination_charge': 2095, 'total_price': 43680}
+CHASSIS = {'chassis_code': 'E3F-138-DRW', 'series': 'E-350', 'wheelbase_inches': 138, 'gvwr_lbs': 10000}
+BODY = {'configuration_name': 'B4 XR', 'configuration_code': 'B4XR-24E', 'length_ft': 24, 'passenger_capacity': 18}
+
+
+def test_pooled_render_is_sampled_in_the_worker(app):
+    queue = PdfRenderQueue(workers=1)
+    try:
+        with app.test_request_context('/api/quotes/q-1/pdf'):
+            thread_id = threading.get_ident()
+            g.profile = ('header', thread_id, time.perf_counter())
+            sampler.start(thread_id)
+            try:
+                pdf_data = queue.run(render_quote_pdf, QUOTE, CHASSIS, BODY)
+            finally:
+                g.pop('profile')
+                counts = sampler.stop(thread_id)
+    finally:
+        queue._executor.shutdown()
+
+    assert pdf_data.startswith(b'%PDF')
+    worker_stacks = [stack for stack in counts if stack.startswith(WORKER_ROOT + ';')]
+    assert worker_stacks, 'no samples from the PDF worker'
+    samples, own, total = hot_functions([('route', counts)])
+    assert any(frame.startswith('render_quote_pdf ') for frame in total)
+
+
+def test_unprofiled_renders_carry_no_samples():
+    result, started, seconds, samples = timed_render(len, 'abc')
+    assert result == 3
+    assert samples is None
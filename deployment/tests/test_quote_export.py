@@ -0,0 +1,15 @@
+def test_export_requires_admin_token(client):
+    response = client.post('/api/quotes/export', json={'quoteIds': ['q-1']})
+    assert response.status_code == 401
+
+
+def test_export_rejects_wrong_token(client, admin_token):
+    response = client.post('/api/quotes/export', json={'quoteIds': ['q-1']}, headers={'X-Admin-Token': 'nope'})
+    assert response.status_code == 401
+
+
+def test_export_rejects_quote_ids_that_are_not_a_list(client, admin_token):
+    for quote_ids in ('abc', ['q-1', 2], {'id': 'q-1'}):
+        response = client.post('/api/quotes/export', json={'quoteIds': quote_ids}, headers={'X-Admin-Token': admin_token})
+        assert response.status_code == 400
+        assert response.get_json()['error'] == 'quoteIds must be a list of quote ids'
@@ -0,0 +1,74 @@
+import pytest
+from src.services.pagination import encode_cursor
+
+
+def test_listing_requires_admin_token(client):
+    response = client.get('/api/quotes')
+    assert response.status_code == 401
+
+
+def test_ndjson_listing_requires_admin_token(client):
+    response = client.get('/api/quotes', headers={'Accept': 'application/x-ndjson'})
+    assert response.status_code == 401
+
+
+def test_listing_rejects_wrong_token(client, admin_token):
+    response = client.get('/api/quotes', headers={'X-Admin-Token': 'nope'})
+    assert response.status_code == 401
+
+
+def test_listing_checks_parameters_once_authorized(client, admin_token):
+    response = client.get('/api/quotes?limit=0', headers={'X-Admin-Token': admin_token})
+    assert response.status_code == 400
+
+
+class FakeQuotes:
+    def __init__(self):
+        self.filters = []
+
+    def table(self, name):
+        return self
+
+    def select(self, columns):
+        return self
+
+    def or_(self, filters):
+        self.filters.append(filters)
+        return self
+
+    def order(self, column, desc=False):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        return type('Response', (), {'data': []})()
+
+
+@pytest.mark.parametrize('values', [
+    ['2025-01-01T00:00:00Z', '1",id.gt."0'],
+    ['2025-01-01T00:00:00Z),or(id.gt.0', '5f0c9a4e-7a56-4f0e-9a59-2b8f0f7c1e11'],
+    ['not a date', '5f0c9a4e-7a56-4f0e-9a59-2b8f0f7c1e11'],
+    [20250101, '5f0c9a4e-7a56-4f0e-9a59-2b8f0f7c1e11'],
+    ['2025-01-01T00:00:00Z', None],
+])
+def test_tampered_cursor_is_rejected(client, admin_token, monkeypatch, values):
+    fake = FakeQuotes()
+    monkeypatch.setattr('src.services.quote_listing.supabase', fake)
+    response = client.get(f'/api/quotes?cursor={encode_cursor(values)}', headers={'X-Admin-Token': admin_token})
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid cursor'}
+    assert fake.filters == []
+
+
+def test_cursor_values_reach_the_filter_normalized(client, admin_token, monkeypatch):
+    fake = FakeQuotes()
+    monkeypatch.setattr('src.services.quote_listing.supabase', fake)
+    cursor = encode_cursor(['2025-01-01T12:00:00.5Z', '5F0C9A4E-7A56-4F0E-9A59-2B8F0F7C1E11'])
+    response = client.get(f'/api/quotes?cursor={cursor}', headers={'X-Admin-Token': admin_token})
+    assert response.status_code == 200
+    assert fake.filters == [
+        'created_at.lt."2025-01-01T12:00:00.500000+00:00",'
+        'and(created_at.eq."2025-01-01T12:00:00.500000+00:00",id.lt."5f0c9a4e-7a56-4f0e-9a59-2b8f0f7c1e11")'
+    ]
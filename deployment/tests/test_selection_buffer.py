@@ -0,0 +1,128 @@
+import uuid
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+from src.services import selection_buffer as selection_buffer_module
+from src.services.selection_buffer import SelectionBuffer
+
+GOOD_SESSION = str(uuid.uuid4())
+OTHER_SESSION = str(uuid.uuid4())
+DELETED_SESSION = str(uuid.uuid4())
+
+
+class FakeSelections:
+    # configuration_selections with the session foreign key
+    def __init__(self):
+        self.rows = []
+        self.inserts = 0
+        self.down = False
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self.pending = rows
+        return self
+
+    def execute(self):
+        self.inserts += 1
+        if self.down:
+            raise httpx.ConnectError('connection refused')
+        if any(row['session_id'] == DELETED_SESSION for row in self.pending):
+            raise APIError({'message': 'violates foreign key constraint', 'code': '23503'})
+        self.rows.extend(self.pending)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeSelections()
+    monkeypatch.setattr(selection_buffer_module, 'supabase', database)
+    return database
+
+
+def selection(session_id):
+    return {
+        'session_id': session_id,
+        'selection_type': 'chassis',
+        'selected_item_id': str(uuid.uuid4()),
+        'selected_item_code': None,
+        'quantity': 1,
+        'unit_price': None,
+        'total_price': None,
+        'is_valid': True
+    }
+
+
+def test_rejected_row_does_not_block_other_sessions(database, capsys):
+    buffer = SelectionBuffer(max_attempts=2)
+    good = [buffer.add(selection(GOOD_SESSION)), buffer.add(selection(OTHER_SESSION))]
+    buffer.add(selection(DELETED_SESSION))
+
+    buffer.flush_all()
+    assert database.rows == good
+    assert buffer._count == 1
+
+    buffer.flush_all()
+    assert buffer._count == 0
+    assert buffer._buffers == {}
+    assert 'Selection dropped after 2 rejected inserts' in capsys.readouterr().out
+
+    buffer.flush_all()
+    assert database.rows == good
+
+
+def test_rows_are_kept_while_supabase_is_down(database):
+    buffer = SelectionBuffer(max_attempts=1)
+    rows = [buffer.add(selection(GOOD_SESSION)) for _ in range(3)]
+    database.down = True
+    with pytest.raises(httpx.ConnectError):
+        buffer.flush_all()
+    assert buffer._buffers == {GOOD_SESSION: rows}
+
+    database.down = False
+    buffer.flush(GOOD_SESSION)
+    assert database.rows == rows
+
+
+def test_full_buffer_refuses_rows(database):
+    buffer = SelectionBuffer(max_rows=1)
+    assert buffer.add(selection(GOOD_SESSION)) is not None
+    assert buffer.add(selection(GOOD_SESSION)) is None
+    buffer.flush_all()
+
+
+def test_write_behind_validates_before_acknowledging(client, monkeypatch, database):
+    monkeypatch.setattr('src.routes.configurations.SELECTION_WRITE_BEHIND', True)
+    monkeypatch.setattr('src.routes.configurations.session_store.get',
+                        lambda session_id: {'id': session_id} if session_id == GOOD_SESSION else None)
+    url = '/api/configurations/sessions/{}/selections'
+
+    response = client.post(url.format(GOOD_SESSION), json={'selectionType': 'chassis', 'selectedItemId': 'not-a-uuid'})
+    assert response.status_code == 400
+    response = client.post(url.format(DELETED_SESSION), json={'selectionType': 'chassis', 'selectedItemId': str(uuid.uuid4())})
+    assert response.status_code == 404
+    response = client.post(url.format(GOOD_SESSION), json={'selectionType': 'chassis', 'selectedItemId': str(uuid.uuid4())})
+    assert response.status_code == 202
+    selection_buffer_module.selection_buffer.flush(GOOD_SESSION)
+    assert [row['session_id'] for row in database.rows] == [GOOD_SESSION]
+
+
+def test_workers_from_gunicorn_config_file(tmp_path, monkeypatch):
+    from src.services import workers
+    config = tmp_path / 'gunicorn.conf.py'
+    monkeypatch.setattr('sys.argv', ['gunicorn', '-c', str(config), 'src.main_full:app'])
+    monkeypatch.delenv('WEB_CONCURRENCY', raising=False)
+    monkeypatch.delenv('GUNICORN_CMD_ARGS', raising=False)
+    monkeypatch.setattr(workers, 'SINGLE_WORKER', True)
+
+    config.write_text('bind = "0.0.0.0:5000"\nworkers = 4\n')
+    assert workers.configured_workers() == 4
+    assert not workers.single_worker('SELECTION_WRITE_BEHIND')
+    config.write_text('workers = multiprocessing.cpu_count() * 2 + 1\n')
+    assert workers.configured_workers() is None
+    assert not workers.single_worker('SELECTION_WRITE_BEHIND')
+    config.write_text('bind = "0.0.0.0:5000"\n')
+    assert workers.single_worker('SELECTION_WRITE_BEHIND')
+
+    monkeypatch.setattr(workers, 'SINGLE_WORKER', False)
+    assert not workers.single_worker('SELECTION_WRITE_BEHIND')
@@ -0,0 +1,26 @@
+import os
+import stat
+from src.services import session_store as session_store_module
+from src.services.session_store import MemorySessionBackend, SqliteSessionBackend, create_backend
+
+
+def test_memory_backend_needs_a_single_worker(monkeypatch, capsys):
+    monkeypatch.setattr('src.services.workers.SINGLE_WORKER', False)
+    assert create_backend('memory') is None
+    assert 'SESSION_STORE_BACKEND=memory ignored' in capsys.readouterr().out
+
+    monkeypatch.setattr('src.services.workers.SINGLE_WORKER', True)
+    monkeypatch.setenv('WEB_CONCURRENCY', '4')
+    assert create_backend('memory') is None
+
+    monkeypatch.setenv('WEB_CONCURRENCY', '1')
+    assert isinstance(create_backend('memory'), MemorySessionBackend)
+
+
+def test_sqlite_file_is_kept_out_of_tmp(tmp_path):
+    assert not session_store_module.SESSION_STORE_PATH.startswith('/tmp/')
+    path = tmp_path / 'data' / 'sessions.sqlite3'
+    backend = SqliteSessionBackend(str(path))
+    backend.put('session', {'id': 'session'}, 1e12)
+    assert backend.get('session')[2] == {'id': 'session'}
+    assert stat.S_IMODE(os.stat(path.parent).st_mode) == 0o700
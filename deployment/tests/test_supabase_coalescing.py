@@ -0,0 +1,145 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.services.metrics import registry
+from src.services.single_flight import SingleFlight
+from src.services.supabase_client import create_http_client, create_async_http_client
+
+READERS = 10
+
+
+@pytest.fixture
+def upstream():
+    # A slow PostgREST stand-in, so concurrent reads overlap
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            time.sleep(0.2)
+            body = json.dumps([{'id': 1}]).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            self.send_response(201)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_port}', hits
+    server.shutdown()
+    server.server_close()
+
+
+def metric_value(name, labels):
+    prefix = f'{name}{{{labels}}} '
+    for line in registry.render().splitlines():
+        if line.startswith(prefix):
+            return float(line[len(prefix):])
+    return 0.0
+
+
+def counts(table):
+    return (metric_value('endera_supabase_requests_total', f'method="GET",table="{table}",status="200"'),
+            metric_value('endera_supabase_coalesced_total', f'method="GET",table="{table}"'))
+
+
+def test_concurrent_identical_reads_count_one_upstream_call(upstream):
+    base_url, hits = upstream
+    client = create_http_client()
+    barrier = threading.Barrier(READERS)
+    results = []
+
+    def read():
+        barrier.wait()
+        results.append(client.get(f'{base_url}/rest/v1/sync_reads?select=*').json())
+
+    threads = [threading.Thread(target=read) for _ in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    client.close()
+
+    assert results == [[{'id': 1}]] * READERS
+    assert len(hits) == 1
+    assert counts('sync_reads') == (1, READERS - 1)
+
+
+def test_concurrent_identical_async_reads_count_one_upstream_call(upstream):
+    base_url, hits = upstream
+
+    async def main():
+        async with create_async_http_client() as client:
+            responses = await asyncio.gather(*[
+                client.get(f'{base_url}/rest/v1/async_reads?select=*') for _ in range(READERS)
+            ])
+        return [response.json() for response in responses]
+
+    assert asyncio.run(main()) == [[{'id': 1}]] * READERS
+    assert len(hits) == 1
+    assert counts('async_reads') == (1, READERS - 1)
+
+
+def test_sequential_reads_are_each_counted(upstream):
+    base_url, hits = upstream
+    with create_http_client() as client:
+        client.get(f'{base_url}/rest/v1/sequential_reads')
+        client.get(f'{base_url}/rest/v1/sequential_reads')
+    assert len(hits) == 2
+    assert counts('sequential_reads') == (2, 0)
+
+
+def test_read_after_a_write_does_not_join_an_earlier_read(upstream):
+    base_url, hits = upstream
+    with create_http_client() as client:
+        before = threading.Thread(target=client.get, args=(f'{base_url}/rest/v1/configuration_sessions?id=eq.1',))
+        before.start()
+        time.sleep(0.05)
+        client.post(f'{base_url}/rest/v1/configuration_selections', json={'session_id': '1'})
+        after = client.get(f'{base_url}/rest/v1/configuration_sessions?id=eq.1')
+        before.join()
+    assert after.status_code == 200
+    assert len(hits) == 2
+
+
+def test_waiters_get_their_own_exception():
+    flight = SingleFlight()
+    barrier = threading.Barrier(READERS)
+    errors = []
+
+    def fail():
+        time.sleep(0.1)
+        raise ValueError('upstream down')
+
+    def call():
+        barrier.wait()
+        try:
+            flight.do('key', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == READERS
+    assert len({id(error) for error in errors}) == READERS
+    assert all(error.args == ('upstream down',) for error in errors)
+    originals = [error for error in errors if error.__cause__ is None]
+    assert len(originals) == 1
+    assert all(error.__cause__ is originals[0] for error in errors if error is not originals[0])